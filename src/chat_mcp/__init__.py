@@ -5,44 +5,13 @@ Chat MCP: MCP客户端库，用于在对话中调用MCP工具
 - MCPChatTool: 主要的聊天工具类
 - start_arxiv_server: 启动ArXiv服务器
 - chat_with_arxiv: 使用ArXiv进行对话
+
+子模块按需加载：首次访问某个名称时才导入对应子模块，
+避免 ``import chat_mcp`` 时就拉起 litellm 和 MCP SDK。
 """
 
-from .mcp_service import MCPService, init_mcp_server, list_mcp_tools
-from .mcp_chat_handler import ChatMCPClient, MCPToolCollector
-from .ai_provider import (
-    AIProvider,
-    build_system_prompt,
-    parse_tool_use,
-    parse_and_call_tools,
-    call_mcp_tool,
-    upsert_mcp_tool_response,
-    register_server_config,
-    get_server_config,
-    default_convert_to_message,
-    callMCPTool,
-    getMcpServerByTool,
-    execute_mcp_tool_calls,
-    complete_mcp_workflow,
-)
-from .ipc_handler import (
-    MCPIPCHandler,
-    get_ipc_handler,
-    handle_ipc_request,
-    window_api_mcp,
-    IpcChannel,
-)
-from .easy_chat import MCPChatTool, create_server_config
-from .mcp_types import (
-    MCPServer,
-    MCPTool,
-    ChatRequest,
-    ChatResponse,
-    ChatMessage,
-    MCPToolCall,
-    MCPToolResponse,
-    MCPCallToolResponse,
-    ToolParseResult,
-)
+import importlib
+from typing import Any, Dict, List, Tuple
 
 __version__ = "0.1.1"
 __all__ = [
@@ -53,9 +22,11 @@ __all__ = [
     "MCPService",
     "init_mcp_server",
     "list_mcp_tools",
+    "close_mcp_service",
     "ChatMCPClient",
     "MCPToolCollector",
     "AIProvider",
+    "get_ai_provider",
     "build_system_prompt",
     "parse_tool_use",
     "parse_and_call_tools",
@@ -72,6 +43,7 @@ __all__ = [
     "MCPIPCHandler",
     "get_ipc_handler",
     "handle_ipc_request",
+    "serialize_ipc_result",
     "window_api_mcp",
     "IpcChannel",
     # 数据类型
@@ -85,3 +57,67 @@ __all__ = [
     "MCPCallToolResponse",
     "ToolParseResult",
 ]
+
+# 公共名称 -> (子模块, 属性名)
+_LAZY_ATTRS: Dict[str, Tuple[str, str]] = {
+    # mcp_service
+    "MCPService": ("mcp_service", "MCPService"),
+    "init_mcp_server": ("mcp_service", "init_mcp_server"),
+    "list_mcp_tools": ("mcp_service", "list_mcp_tools"),
+    "close_mcp_service": ("mcp_service", "close_mcp_service"),
+    # mcp_chat_handler
+    "ChatMCPClient": ("mcp_chat_handler", "ChatMCPClient"),
+    "MCPToolCollector": ("mcp_chat_handler", "MCPToolCollector"),
+    # ai_provider
+    "AIProvider": ("ai_provider", "AIProvider"),
+    "get_ai_provider": ("ai_provider", "get_ai_provider"),
+    "build_system_prompt": ("ai_provider", "build_system_prompt"),
+    "parse_tool_use": ("ai_provider", "parse_tool_use"),
+    "parse_and_call_tools": ("ai_provider", "parse_and_call_tools"),
+    "call_mcp_tool": ("ai_provider", "call_mcp_tool"),
+    "upsert_mcp_tool_response": ("ai_provider", "upsert_mcp_tool_response"),
+    "register_server_config": ("ai_provider", "register_server_config"),
+    "get_server_config": ("ai_provider", "get_server_config"),
+    "default_convert_to_message": ("ai_provider", "default_convert_to_message"),
+    "callMCPTool": ("ai_provider", "callMCPTool"),
+    "getMcpServerByTool": ("ai_provider", "getMcpServerByTool"),
+    "execute_mcp_tool_calls": ("ai_provider", "execute_mcp_tool_calls"),
+    "complete_mcp_workflow": ("ai_provider", "complete_mcp_workflow"),
+    # ipc_handler
+    "MCPIPCHandler": ("ipc_handler", "MCPIPCHandler"),
+    "get_ipc_handler": ("ipc_handler", "get_ipc_handler"),
+    "handle_ipc_request": ("ipc_handler", "handle_ipc_request"),
+    "serialize_ipc_result": ("ipc_handler", "serialize_ipc_result"),
+    "window_api_mcp": ("ipc_handler", "window_api_mcp"),
+    "IpcChannel": ("ipc_handler", "IpcChannel"),
+    # easy_chat
+    "MCPChatTool": ("easy_chat", "MCPChatTool"),
+    "create_server_config": ("easy_chat", "create_server_config"),
+    # mcp_types
+    "MCPServer": ("mcp_types", "MCPServer"),
+    "MCPTool": ("mcp_types", "MCPTool"),
+    "ChatRequest": ("mcp_types", "ChatRequest"),
+    "ChatResponse": ("mcp_types", "ChatResponse"),
+    "ChatMessage": ("mcp_types", "ChatMessage"),
+    "MCPToolCall": ("mcp_types", "MCPToolCall"),
+    "MCPToolResponse": ("mcp_types", "MCPToolResponse"),
+    "MCPCallToolResponse": ("mcp_types", "MCPCallToolResponse"),
+    "ToolParseResult": ("mcp_types", "ToolParseResult"),
+}
+
+
+def __getattr__(name: str) -> Any:
+    """按需导入子模块并缓存到包命名空间（PEP 562）"""
+    try:
+        module_name, attr_name = _LAZY_ATTRS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), attr_name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    """包含尚未加载的公共名称"""
+    return sorted(set(globals()) | set(__all__))
@@ -3,14 +3,19 @@ AI Provider模块：实现LLM调用和MCP工具集成
 """
 
 import asyncio
+import functools
 import json
 import re
 import logging
 import os
-from typing import List, Dict, Any, Optional, Callable
-from dotenv import load_dotenv
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Sequence, Tuple
 
-import litellm
+try:
+    # 可选依赖：orjson序列化参数结构更快
+    import orjson as _orjson
+except ImportError:  # 未安装orjson时回退到标准库
+    _orjson = None
 
 from .mcp_types import (
     MCPTool,
@@ -21,20 +26,27 @@ from .mcp_types import (
     ToolParseResult,
     MCPServer,
     MCPToolResponse,
+    load_dotenv_once,
 )
 from .mcp_service import get_mcp_service
 
-# 加载环境变量
-load_dotenv()
-
 logger = logging.getLogger(__name__)
 
+
+@functools.cache
+def _litellm():
+    """按需导入litellm，避免仅使用解析/提示词工具时的导入开销"""
+    import litellm
+
+    return litellm
+
+
 # 系统提示词模板
-SYSTEM_PROMPT_TEMPLATE = """{{ USER_SYSTEM_PROMPT }}
+SYSTEM_PROMPT_TEMPLATE = """{user_system_prompt}
 
-{{ TOOL_USE_EXAMPLES }}
+{tool_use_examples}
 
-{{ AVAILABLE_TOOLS }}"""
+{available_tools}"""
 
 # 工具使用示例
 TOOL_USE_EXAMPLES = """
@@ -61,9 +73,25 @@ IMPORTANT RULES:
    simply omit them from the parameters object
 """
 
+# 工具调用XML匹配模式
+_TOOL_USE_RE = re.compile(
+    r"<tool_use>\s*<tool_name>([^<]+)</tool_name>\s*"
+    r"<parameters>([^<]*)</parameters>\s*</tool_use>",
+    re.DOTALL,
+)
+
 # 全局服务器配置存储
 _server_configs: Dict[str, MCPServer] = {}
 
+# 系统提示词缓存容量（用户提示词与工具列表内容的组合数）
+_SYSTEM_PROMPT_CACHE_SIZE = 32
+
+# 工具列表的内容键：每个工具的 (名称, 描述, 参数结构的JSON)
+ToolsPromptKey = Tuple[Tuple[str, str, str], ...]
+
+# 系统提示词缓存：(用户提示词, 工具内容键) -> 系统提示词，按最近使用淘汰
+_system_prompt_cache: "OrderedDict[Tuple[str, ToolsPromptKey], str]" = OrderedDict()
+
 
 def register_server_config(server: MCPServer) -> None:
     """注册服务器配置"""
@@ -75,6 +103,24 @@ def get_server_config(server_id: str) -> Optional[MCPServer]:
     return _server_configs.get(server_id)
 
 
+def build_tool_index(mcp_tools: Optional[List[MCPTool]]) -> Dict[str, MCPTool]:
+    """
+    构建工具名称到工具的索引，供批量调用时复用
+
+    多个服务器提供同名工具时保留列表中的第一个，与逐个查找的结果一致
+
+    Args:
+        mcp_tools: MCP工具列表
+
+    Returns:
+        工具名称 -> MCP工具 的字典
+    """
+    tool_index: Dict[str, MCPTool] = {}
+    for tool in mcp_tools or ():
+        tool_index.setdefault(tool.name, tool)
+    return tool_index
+
+
 def build_available_tools_prompt(tools: List[MCPTool]) -> str:
     """
     构建可用工具的提示词
@@ -88,54 +134,96 @@ def build_available_tools_prompt(tools: List[MCPTool]) -> str:
     if not tools:
         return ""
 
-    tools_desc = "Available tools:\n\n"
-    for tool in tools:
-        tools_desc += f"- **{tool.name}**: {tool.description}\n"
+    return "".join(
+        [
+            "Available tools:\n\n",
+            *(
+                _render_tool_prompt(tool.name, tool.description, tool.inputSchema)
+                for tool in tools
+            ),
+        ]
+    )
 
-        # 添加参数描述
-        if tool.inputSchema and "properties" in tool.inputSchema:
-            properties = tool.inputSchema["properties"]
-            required = tool.inputSchema.get("required", [])
 
-            tools_desc += "  Parameters:\n"
-            for param_name, param_info in properties.items():
-                param_type = param_info.get("type", "string")
-                param_desc = param_info.get("description", "")
-                is_required = param_name in required
-                req_marker = " (required)" if is_required else ""
+def _render_tool_prompt(
+    name: str, description: str, input_schema: Dict[str, Any]
+) -> str:
+    """生成单个工具的描述片段"""
+    parts = [f"- **{name}**: {description}\n"]
+    append = parts.append
 
-                tools_desc += (
-                    f"    - {param_name} ({param_type}){req_marker}: {param_desc}\n"
-                )
+    # 添加参数描述
+    if input_schema and "properties" in input_schema:
+        properties = input_schema["properties"]
+        required = input_schema.get("required", [])
+
+        append("  Parameters:\n")
+        for param_name, param_info in properties.items():
+            param_type = param_info.get("type", "string")
+            param_desc = param_info.get("description", "")
+            is_required = param_name in required
+            req_marker = " (required)" if is_required else ""
 
-        tools_desc += "\n"
+            append(f"    - {param_name} ({param_type}){req_marker}: {param_desc}\n")
 
-    return tools_desc
+    append("\n")
+    return "".join(parts)
 
 
-def build_system_prompt(user_system_prompt: str, tools: List[MCPTool]) -> str:
+def _schema_json(input_schema: Dict[str, Any]) -> str:
+    """
+    参数结构的JSON，用作缓存键
+
+    保留键的原有顺序：参数按该顺序写入提示词，顺序不同的参数结构分别缓存
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(input_schema).decode()
+        except TypeError:  # orjson不支持的内容（如非字符串键）交给标准库处理
+            pass
+    return json.dumps(input_schema)
+
+
+def _tools_prompt_key(tools: Sequence[MCPTool]) -> ToolsPromptKey:
+    """根据工具名称、描述和参数结构的当前内容生成缓存键"""
+    return tuple(
+        (tool.name, tool.description, _schema_json(tool.inputSchema)) for tool in tools
+    )
+
+
+def build_system_prompt(
+    user_system_prompt: str, tools: Optional[Sequence[MCPTool]] = None
+) -> str:
     """
     构建包含工具信息的系统提示词
 
     Args:
         user_system_prompt: 用户定义的系统提示词
-        tools: MCP工具列表
+        tools: MCP工具列表（可选）
 
     Returns:
-        完整的系统提示词
-
-
+        完整的系统提示词，没有工具时原样返回用户提示词
     """
-    if tools and len(tools) > 0:
-        return (
-            SYSTEM_PROMPT_TEMPLATE.replace(
-                "{{ USER_SYSTEM_PROMPT }}", user_system_prompt
-            )
-            .replace("{{ TOOL_USE_EXAMPLES }}", TOOL_USE_EXAMPLES)
-            .replace("{{ AVAILABLE_TOOLS }}", build_available_tools_prompt(tools))
-        )
-
-    return user_system_prompt
+    if not tools:
+        return user_system_prompt
+
+    # 多轮对话中提示词和工具列表通常不变，内容相同时直接复用已渲染的提示词；
+    # 缓存键由工具的当前内容生成，工具参数结构被原地修改后也会重新渲染
+    key = (user_system_prompt, _tools_prompt_key(tools))
+    system_prompt = _system_prompt_cache.get(key)
+    if system_prompt is not None:
+        _system_prompt_cache.move_to_end(key)
+        return system_prompt
+
+    system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
+        user_system_prompt=user_system_prompt,
+        tool_use_examples=TOOL_USE_EXAMPLES,
+        available_tools=build_available_tools_prompt(list(tools)),
+    )
+    _system_prompt_cache[key] = system_prompt
+    if len(_system_prompt_cache) > _SYSTEM_PROMPT_CACHE_SIZE:
+        _system_prompt_cache.popitem(last=False)
+    return system_prompt
 
 
 def parse_tool_use(
@@ -152,28 +240,20 @@ def parse_tool_use(
     Returns:
         解析出的工具调用列表
     """
-    tools = []
+    # 快速路径：不含工具调用标签时跳过正则扫描
+    if not content or "<tool_use>" not in content:
+        return []
 
-    # 使用正则表达式匹配工具调用XML
-    pattern = (
-        r"<tool_use>\s*<tool_name>([^<]+)</tool_name>\s*"
-        r"<parameters>([^<]*)</parameters>\s*</tool_use>"
-    )
-    matches = re.findall(pattern, content, re.DOTALL)
+    tools = []
 
-    for i, match in enumerate(matches):
-        tool_name = match[0].strip()
-        parameters_str = match[1].strip()
+    # 使用预编译的正则表达式逐个匹配工具调用XML
+    for i, match in enumerate(_TOOL_USE_RE.finditer(content)):
+        tool_name = match[1].strip()
+        parameters_str = match[2].strip()
 
         try:
-            # 解析参数
-            parameters = json.loads(parameters_str.strip())
-
-            # 查找对应的MCP工具（可选验证）
-            if mcp_tools:
-                for tool in mcp_tools:
-                    if tool.name == tool_name:
-                        break
+            # 解析参数（使用标准库：orjson不接受NaN，且会把超出64位的整数转为浮点数）
+            parameters = json.loads(parameters_str)
 
             # 创建工具调用
             tool_call = MCPToolCall(
@@ -192,8 +272,67 @@ def parse_tool_use(
     return tools
 
 
+@functools.cache
+def _mcp_content_types() -> Tuple[Optional[type], Optional[type]]:
+    """按需导入MCP SDK的内容类型，未安装时返回(None, None)"""
+    try:
+        from mcp.types import TextContent, ImageContent
+    except ImportError:
+        return None, None
+    return TextContent, ImageContent
+
+
+def _image_content_dict(item: Any) -> Dict[str, Any]:
+    """将ImageContent对象转换为字典"""
+    return {
+        "type": "image",
+        "data": item.data,
+        "mimeType": getattr(item, "mimeType", "image/png"),
+    }
+
+
+def _convert_mcp_content(result: Any) -> List[Dict[str, Any]]:
+    """
+    转换MCP SDK返回的内容格式
+
+    先用isinstance匹配常见的TextContent/ImageContent，
+    其他类型再回退到按属性判断。
+
+    Args:
+        result: MCP服务返回的工具调用结果
+
+    Returns:
+        内容字典列表
+    """
+    if not hasattr(result, "content"):
+        return [{"type": "text", "text": str(result)}]
+
+    text_type, image_type = _mcp_content_types()
+    content = []
+    for item in result.content:
+        if text_type is not None and isinstance(item, text_type):
+            content.append({"type": "text", "text": item.text})
+        elif image_type is not None and isinstance(item, image_type):
+            content.append(_image_content_dict(item))
+        elif isinstance(item, dict):
+            # 如果已经是字典格式
+            content.append(item)
+        elif hasattr(item, "text"):
+            # 处理TextContent对象
+            content.append({"type": "text", "text": item.text})
+        elif hasattr(item, "data"):
+            # 处理ImageContent对象
+            content.append(_image_content_dict(item))
+        else:
+            # 其他情况，转为文本
+            content.append({"type": "text", "text": str(item)})
+    return content
+
+
 async def call_mcp_tool(
-    tool_call: MCPToolCall, mcp_tools: Optional[List[MCPTool]] = None
+    tool_call: MCPToolCall,
+    mcp_tools: Optional[List[MCPTool]] = None,
+    tool_index: Optional[Dict[str, MCPTool]] = None,
 ) -> MCPCallToolResponse:
     """
     调用MCP工具
@@ -202,22 +341,20 @@ async def call_mcp_tool(
     Args:
         tool_call: 工具调用信息
         mcp_tools: 可用的MCP工具列表
+        tool_index: 预先构建的工具名称索引（可选，批量调用时避免重复查找）
 
     Returns:
         工具调用响应
     """
     try:
         # 查找对应的MCP工具
-        target_tool = None
-        if mcp_tools:
-            for tool in mcp_tools:
-                if tool.name == tool_call.name:
-                    target_tool = tool
-                    break
+        if tool_index is None:
+            tool_index = build_tool_index(mcp_tools)
+        target_tool = tool_index.get(tool_call.name)
 
         if not target_tool:
             logger.error(f"Tool not found: {tool_call.name}")
-            return MCPCallToolResponse(
+            return MCPCallToolResponse.model_construct(
                 content=[
                     {"type": "text", "text": f"错误：找不到工具 {tool_call.name}"}
                 ],
@@ -228,7 +365,7 @@ async def call_mcp_tool(
         server_config = get_server_config(target_tool.server_id)
         if not server_config:
             logger.error(f"Server config not found: {target_tool.server_id}")
-            return MCPCallToolResponse(
+            return MCPCallToolResponse.model_construct(
                 content=[
                     {
                         "type": "text",
@@ -247,36 +384,13 @@ async def call_mcp_tool(
         )
 
         # 处理调用结果
-        if hasattr(result, "content"):
-            # 转换MCP SDK返回的内容格式
-            content = []
-            for item in result.content:
-                if hasattr(item, "text"):
-                    # 处理TextContent对象
-                    content.append({"type": "text", "text": item.text})
-                elif hasattr(item, "data"):
-                    # 处理ImageContent对象
-                    content.append(
-                        {
-                            "type": "image",
-                            "data": item.data,
-                            "mimeType": getattr(item, "mimeType", "image/png"),
-                        }
-                    )
-                elif isinstance(item, dict):
-                    # 如果已经是字典格式
-                    content.append(item)
-                else:
-                    # 其他情况，转为文本
-                    content.append({"type": "text", "text": str(item)})
-        else:
-            content = [{"type": "text", "text": str(result)}]
+        content = _convert_mcp_content(result)
 
-        return MCPCallToolResponse(content=content, isError=False)
+        return MCPCallToolResponse.model_construct(content=content, isError=False)
 
     except Exception as e:
         logger.error(f"Failed to call MCP tool {tool_call.name}: {e}")
-        return MCPCallToolResponse(
+        return MCPCallToolResponse.model_construct(
             content=[{"type": "text", "text": f"工具调用失败：{str(e)}"}], isError=True
         )
 
@@ -285,6 +399,7 @@ def upsert_mcp_tool_response(
     tool_responses: List[MCPToolResponse],
     tool_response: MCPToolResponse,
     on_chunk: Optional[Callable] = None,
+    response_index: Optional[Dict[str, int]] = None,
 ) -> None:
     """
     更新或插入MCP工具响应
@@ -294,24 +409,38 @@ def upsert_mcp_tool_response(
         tool_responses: 工具响应列表
         tool_response: 新的工具响应
         on_chunk: 流式响应回调函数
+        response_index: 响应ID到列表下标的索引（可选，由调用方与列表一同维护）
     """
     # 查找是否已存在相同ID的响应
-    for i, existing_response in enumerate(tool_responses):
-        if existing_response.id == tool_response.id:
-            tool_responses[i] = tool_response
-            if on_chunk:
-                on_chunk(
-                    {
-                        "text": (
-                            f"[工具更新] {tool_response.tool.name}: "
-                            f"{tool_response.status}\n"
-                        ),
-                        "tool_response": tool_response.model_dump(),
-                    }
-                )
-            return
+    if response_index is not None:
+        existing_idx = response_index.get(tool_response.id)
+    else:
+        existing_idx = next(
+            (
+                i
+                for i, existing_response in enumerate(tool_responses)
+                if existing_response.id == tool_response.id
+            ),
+            None,
+        )
+
+    if existing_idx is not None:
+        tool_responses[existing_idx] = tool_response
+        if on_chunk:
+            on_chunk(
+                {
+                    "text": (
+                        f"[工具更新] {tool_response.tool.name}: "
+                        f"{tool_response.status}\n"
+                    ),
+                    "tool_response": tool_response.model_dump(),
+                }
+            )
+        return
 
     # 如果不存在，则添加新的响应
+    if response_index is not None:
+        response_index[tool_response.id] = len(tool_responses)
     tool_responses.append(tool_response)
     if on_chunk:
         on_chunk(
@@ -322,6 +451,18 @@ def upsert_mcp_tool_response(
         )
 
 
+def _no_content_text(content_item: Dict[str, Any]) -> str:
+    """未知类型的内容项不产生文本"""
+    return ""
+
+
+# 内容类型 -> 文本提取函数
+_CONTENT_TEXT_HANDLERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "text": lambda content_item: content_item.get("text", ""),
+    "image": lambda content_item: f"[图像: {content_item.get('mimeType', 'image')}]",
+}
+
+
 def default_convert_to_message(
     tool_call_id: str, response: MCPCallToolResponse, is_vision_model: bool = False
 ) -> ChatMessage:
@@ -337,18 +478,33 @@ def default_convert_to_message(
         转换后的聊天消息
     """
     # 提取文本内容
-    text_content = ""
-    for content_item in response.content:
-        if content_item.get("type") == "text":
-            text_content += content_item.get("text", "")
-        elif content_item.get("type") == "image":
-            text_content += f"[图像: {content_item.get('mimeType', 'image')}]"
+    text_content = "".join(
+        _CONTENT_TEXT_HANDLERS.get(content_item.get("type"), _no_content_text)(
+            content_item
+        )
+        for content_item in response.content
+    )
 
     return ChatMessage(
         role="tool",
         content=text_content,
         tool_call_id=tool_call_id,
-        metadata={"tool_response": response.model_dump(), "is_error": response.isError},
+        metadata={
+            "tool_response": _call_tool_response_dict(response),
+            "is_error": response.isError,
+        },
+    )
+
+
+def _image_data_url(content_item: Dict[str, Any]) -> str:
+    """将图像内容项转换为data URL，一次性拼接避免中间字符串"""
+    return "".join(
+        (
+            "data:",
+            content_item.get("mimeType", "image/png"),
+            ";base64,",
+            content_item["data"],
+        )
     )
 
 
@@ -382,11 +538,20 @@ async def parse_and_call_tools(
 
     tool_results: List[ChatMessage] = []
 
+    # 快速路径：不含工具调用标签时直接返回
+    if not content or "<tool_use>" not in content:
+        return tool_results
+
     # 解析工具使用
     tools = parse_tool_use(content, mcp_tools or [])
     if not tools or len(tools) == 0:
         return tool_results
 
+    # 响应ID索引，避免每次更新都线性扫描tool_responses
+    response_index = {
+        existing_response.id: i for i, existing_response in enumerate(tool_responses)
+    }
+
     # 为每个工具创建初始响应
     for i, tool_parse_result in enumerate(tools):
         tool_response = MCPToolResponse(
@@ -394,17 +559,21 @@ async def parse_and_call_tools(
             tool=tool_parse_result.tool,
             status="invoking",
         )
-        upsert_mcp_tool_response(tool_responses, tool_response, on_chunk)
+        upsert_mcp_tool_response(
+            tool_responses, tool_response, on_chunk, response_index
+        )
 
     # 并行执行所有工具调用
-    images: List[str] = []
+    tool_index = build_tool_index(mcp_tools)
 
     async def execute_single_tool(
         tool_parse_result: ToolParseResult, i: int
     ) -> ChatMessage:
         """执行单个工具调用"""
         try:
-            tool_call_response = await call_mcp_tool(tool_parse_result.tool, mcp_tools)
+            tool_call_response = await call_mcp_tool(
+                tool_parse_result.tool, mcp_tools, tool_index
+            )
 
             # 更新工具响应状态
             tool_response = MCPToolResponse(
@@ -414,22 +583,27 @@ async def parse_and_call_tools(
                 content=tool_call_response.content,
                 error=None if not tool_call_response.isError else "工具调用失败",
             )
-            upsert_mcp_tool_response(tool_responses, tool_response, on_chunk)
-
-            # 处理图像内容
-            for content_item in tool_call_response.content:
-                if content_item.get("type") == "image" and content_item.get("data"):
-                    mime_type = content_item.get("mimeType", "image/png")
-                    images.append(f"data:{mime_type};base64,{content_item['data']}")
+            upsert_mcp_tool_response(
+                tool_responses, tool_response, on_chunk, response_index
+            )
 
-            # 发送图像更新
-            if images and on_chunk:
-                on_chunk(
-                    {
-                        "text": "\n",
-                        "generateImage": {"type": "base64", "images": images},
-                    }
-                )
+            # 处理图像内容（仅发送本次工具调用新产生的图像）
+            # 没有回调时无需拼接可能很大的data URL
+            if on_chunk:
+                new_images = [
+                    _image_data_url(content_item)
+                    for content_item in tool_call_response.content
+                    if content_item.get("type") == "image" and content_item.get("data")
+                ]
+
+                # 发送图像更新
+                if new_images:
+                    on_chunk(
+                        {
+                            "text": "\n",
+                            "generateImage": {"type": "base64", "images": new_images},
+                        }
+                    )
 
             # 转换为聊天消息
             return convert_to_message(
@@ -439,7 +613,7 @@ async def parse_and_call_tools(
         except Exception as e:
             logger.error(f"Tool execution failed: {e}")
             # 创建错误响应
-            error_response = MCPCallToolResponse(
+            error_response = MCPCallToolResponse.model_construct(
                 content=[{"type": "text", "text": f"工具执行失败：{str(e)}"}],
                 isError=True,
             )
@@ -454,12 +628,33 @@ async def parse_and_call_tools(
     return tool_results
 
 
+def _call_tool_response_dict(response: MCPCallToolResponse) -> Dict[str, Any]:
+    """
+    将工具调用响应转换为字典
+
+    字段固定且content已是字典列表，直接构建，避免model_dump逐字段递归序列化
+    """
+    return {"content": list(response.content), "isError": response.isError}
+
+
+def _usage_to_dict(usage: Any) -> Dict[str, Any]:
+    """将LiteLLM的usage对象转换为字典，优先使用pydantic v2的model_dump"""
+    if not usage:
+        return {}
+    if hasattr(usage, "model_dump"):
+        return usage.model_dump()
+    return usage.dict()
+
+
 class AIProvider:
     """
     AI Provider：负责LLM调用和响应处理
     """
 
     def __init__(self):
+        # 加载环境变量
+        load_dotenv_once()
+
         # 设置LiteLLM的基础URL（如果有的话）
         if os.getenv("OPENAI_API_BASE"):
             os.environ["OPENAI_API_BASE"] = os.getenv("OPENAI_API_BASE")
@@ -562,13 +757,46 @@ class AIProvider:
         mcp_tools: Optional[List[MCPTool]],
     ) -> ChatResponse:
         """同步完成LLM调用"""
-        response = await litellm.acompletion(
+        response = await _litellm().acompletion(
             model=model, messages=messages, temperature=temperature
         )
 
         # 提取响应内容
         content = response.choices[0].message.content
-        usage = response.usage.dict() if response.usage else {}
+        return self._build_response(content, response.usage, mcp_tools)
+
+    async def _stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float,
+        mcp_tools: Optional[List[MCPTool]],
+        on_chunk: Optional[Callable],
+    ) -> ChatResponse:
+        """流式完成LLM调用，每收到一段文本即通过on_chunk回调"""
+        response = await _litellm().acompletion(
+            model=model, messages=messages, temperature=temperature, stream=True
+        )
+
+        parts: List[str] = []
+        usage = None
+        async for chunk in response:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    if on_chunk:
+                        on_chunk({"text": delta})
+            # 部分模型在最后一个分片中返回用量信息
+            usage = getattr(chunk, "usage", None) or usage
+
+        return self._build_response("".join(parts), usage, mcp_tools)
+
+    def _build_response(
+        self, content: str, usage: Any, mcp_tools: Optional[List[MCPTool]]
+    ) -> ChatResponse:
+        """根据LLM输出构建聊天响应，并解析其中的工具调用"""
+        usage = _usage_to_dict(usage)
 
         # 解析工具调用
         tool_calls = parse_tool_use(content, mcp_tools)
@@ -578,7 +806,9 @@ class AIProvider:
             content=content,
             metadata={
                 "mcp_tools": (
-                    [tool.tool.dict() for tool in tool_calls] if mcp_tools else []
+                    [tool.tool.model_dump(exclude_none=True) for tool in tool_calls]
+                    if mcp_tools
+                    else []
                 ),
                 "tool_calls_detected": len(tool_calls),
                 "parsed_tool_calls": tool_calls,
@@ -596,21 +826,11 @@ class AIProvider:
             },
         )
 
-    async def _stream_completion(
-        self,
-        messages: List[Dict[str, str]],
-        model: str,
-        temperature: float,
-        mcp_tools: Optional[List[MCPTool]],
-        on_chunk: Optional[Callable],
-    ) -> ChatResponse:
-        """流式完成LLM调用"""
-        # 流式实现的占位符
-        # 在实际应用中，这里会实现真正的流式处理
-        logger.info(
-            "[AI] Stream completion not fully implemented, falling back to sync"
-        )
-        return await self._sync_completion(messages, model, temperature, mcp_tools)
+
+@functools.cache
+def get_ai_provider() -> AIProvider:
+    """获取共享的AIProvider实例，环境变量只在首次调用时读取"""
+    return AIProvider()
 
 
 def getMcpServerByTool(tool: MCPTool) -> Optional[MCPServer]:
@@ -628,7 +848,10 @@ def getMcpServerByTool(tool: MCPTool) -> Optional[MCPServer]:
 
 
 async def callMCPTool(
-    tool_name: str, arguments: Dict[str, Any], mcp_tools: List[MCPTool]
+    tool_name: str,
+    arguments: Dict[str, Any],
+    mcp_tools: List[MCPTool],
+    tool_index: Optional[Dict[str, MCPTool]] = None,
 ) -> MCPCallToolResponse:
     """
     使用工具名称和参数调用MCP工具
@@ -638,6 +861,7 @@ async def callMCPTool(
         tool_name: 工具名称
         arguments: 工具调用参数（从LLM响应中解析出来的）
         mcp_tools: 可用的MCP工具列表
+        tool_index: 预先构建的工具名称索引（可选，批量调用时避免重复查找）
 
     Returns:
         工具调用响应
@@ -661,11 +885,9 @@ async def callMCPTool(
         logger.info(f"[MCP] Cleaned args: {cleaned_arguments}")
 
         # 查找对应的MCP工具定义
-        target_tool = None
-        for tool in mcp_tools:
-            if tool.name == tool_name:
-                target_tool = tool
-                break
+        if tool_index is None:
+            tool_index = build_tool_index(mcp_tools)
+        target_tool = tool_index.get(tool_name)
 
         if not target_tool:
             raise Exception(f"Tool not found: {tool_name}")
@@ -682,37 +904,15 @@ async def callMCPTool(
         result = await mcp_service.call_tool(server, tool_name, cleaned_arguments)
 
         # 处理调用结果
-        if hasattr(result, "content"):
-            # 转换MCP SDK返回的内容格式
-            content = []
-            for item in result.content:
-                if hasattr(item, "text"):
-                    # 处理TextContent对象
-                    content.append({"type": "text", "text": item.text})
-                elif hasattr(item, "data"):
-                    # 处理ImageContent对象
-                    content.append(
-                        {
-                            "type": "image",
-                            "data": item.data,
-                            "mimeType": getattr(item, "mimeType", "image/png"),
-                        }
-                    )
-                elif isinstance(item, dict):
-                    # 如果已经是字典格式
-                    content.append(item)
-                else:
-                    # 其他情况，转为文本
-                    content.append({"type": "text", "text": str(item)})
-        else:
-            content = [{"type": "text", "text": str(result)}]
+        content = _convert_mcp_content(result)
 
         logger.info(f"[MCP] Tool called successfully: {tool_name}")
-        return MCPCallToolResponse(content=content, isError=False)
+        # 内容已由_convert_mcp_content转换为字典列表，跳过重复校验
+        return MCPCallToolResponse.model_construct(content=content, isError=False)
 
     except Exception as e:
         logger.error(f"[MCP] Error calling Tool: {tool_name}: {e}")
-        return MCPCallToolResponse(
+        return MCPCallToolResponse.model_construct(
             content=[
                 {"type": "text", "text": (f"Error calling tool {tool_name}: {str(e)}")}
             ],
@@ -724,6 +924,8 @@ async def execute_mcp_tool_calls(
     tool_calls: List[ToolParseResult],
     mcp_tools: List[MCPTool],
     on_progress: Optional[Callable] = None,
+    tool_index: Optional[Dict[str, MCPTool]] = None,
+    max_concurrency: Optional[int] = None,
 ) -> List[MCPCallToolResponse]:
     """
     批量执行MCP工具调用
@@ -733,27 +935,85 @@ async def execute_mcp_tool_calls(
         tool_calls: 从LLM响应中解析出的工具调用列表
         mcp_tools: 可用的MCP工具列表
         on_progress: 进度回调函数
+        tool_index: 预先构建的工具名称索引（可选，避免每轮重复构建）
+        max_concurrency: 同时执行的工具调用数量上限（可选，默认不限制；
+            每个服务器的并发另受会话池大小限制）
 
     Returns:
         工具调用响应列表
     """
-    results = []
+    if tool_index is None:
+        tool_index = build_tool_index(mcp_tools)
+
+    semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
 
-    for i, tool_call in enumerate(tool_calls):
+    async def execute_single_call(
+        tool_call: ToolParseResult, i: int
+    ) -> MCPCallToolResponse:
+        """执行单个工具调用"""
         if on_progress:
             on_progress(f"执行工具 {i+1}/{len(tool_calls)}: {tool_call.tool.name}")
 
-        # 调用单个工具
-        response = await callMCPTool(
-            tool_call.tool.name, tool_call.tool.arguments, mcp_tools
-        )
-        results.append(response)
+        # 调用单个工具（callMCPTool内部将异常转换为isError响应）
+        if semaphore is None:
+            response = await callMCPTool(
+                tool_call.tool.name, tool_call.tool.arguments, mcp_tools, tool_index
+            )
+        else:
+            async with semaphore:
+                response = await callMCPTool(
+                    tool_call.tool.name, tool_call.tool.arguments, mcp_tools, tool_index
+                )
 
         if on_progress:
             status = "成功" if not response.isError else "失败"
             on_progress(f"工具 {tool_call.tool.name} 执行{status}")
 
-    return results
+        return response
+
+    # 并行执行所有工具调用，结果顺序与tool_calls一致
+    return list(
+        await asyncio.gather(
+            *(
+                execute_single_call(tool_call, i)
+                for i, tool_call in enumerate(tool_calls)
+            )
+        )
+    )
+
+
+def _tool_result_text(result: MCPCallToolResponse) -> str:
+    """提取工具结果的文本内容"""
+    if not result.content:
+        return ""
+    return "".join(
+        (
+            content_item.get("text", "")
+            if content_item.get("type") == "text"
+            else str(content_item)
+        )
+        for content_item in result.content
+    )
+
+
+def _build_tool_result_message(
+    tool_call: ToolParseResult, result: MCPCallToolResponse, result_text: str
+) -> ChatMessage:
+    """创建更清晰的工具结果消息，让LLM明确知道工具已执行完成"""
+    return ChatMessage(
+        role="user",  # 改为user角色，让LLM更容易理解这是输入信息
+        content=(
+            f"工具调用结果：\n工具名称：{tool_call.tool.name}\n"
+            f"执行状态：{'成功' if not result.isError else '失败'}\n"
+            f"结果内容：\n{result_text}"
+        ),
+        metadata={
+            "tool_name": tool_call.tool.name,
+            "tool_result": _call_tool_response_dict(result),
+            "is_error": result.isError,
+            "message_type": "tool_result",
+        },
+    )
 
 
 async def complete_mcp_workflow(
@@ -762,6 +1022,7 @@ async def complete_mcp_workflow(
     model: Optional[str] = None,
     max_iterations: int = 3,
     on_progress: Optional[Callable] = None,
+    on_chunk: Optional[Callable] = None,
 ) -> ChatResponse:
     """
     完整的MCP工作流程：
@@ -777,6 +1038,7 @@ async def complete_mcp_workflow(
         model: LLM模型名称
         max_iterations: 最大迭代次数（防止无限循环）
         on_progress: 进度回调函数
+        on_chunk: 流式响应回调函数；设置后LLM输出按文本片段实时回调
 
     Returns:
         最终的聊天响应
@@ -784,24 +1046,43 @@ async def complete_mcp_workflow(
     if on_progress:
         on_progress("🚀 开始MCP完整工作流程")
 
-    # 1. 从启用的服务器获取工具列表
-    if on_progress:
-        on_progress(f"📡 从 {len(enabled_servers)} 个服务器获取工具列表")
+    # 设置了on_chunk时使用流式调用
+    stream = on_chunk is not None
 
-    from .mcp_chat_handler import MCPToolCollector
+    # 1. 从启用的服务器获取工具列表（没有启用的服务器时跳过收集器）
+    mcp_tools: List[MCPTool] = []
+    tool_index: Optional[Dict[str, MCPTool]] = None
+    if enabled_servers:
+        if on_progress:
+            on_progress(f"📡 从 {len(enabled_servers)} 个服务器获取工具列表")
 
-    tool_collector = MCPToolCollector()
-    mcp_tools = await tool_collector.collect_mcp_tools(enabled_servers)
+        from .mcp_chat_handler import MCPToolCollector
 
-    if on_progress:
-        on_progress(f"✅ 获取到 {len(mcp_tools)} 个可用工具")
+        tool_collector = MCPToolCollector()
+        mcp_tools = await tool_collector.collect_mcp_tools(enabled_servers)
+        tool_index = tool_collector.tool_index
+
+        if on_progress:
+            on_progress(f"✅ 获取到 {len(mcp_tools)} 个可用工具")
+
+    provider = get_ai_provider()
+
+    # 没有可用工具时直接生成回答，无需进入工具调用循环
+    if not mcp_tools:
+        if on_progress:
+            on_progress("ℹ️ 没有可用工具，直接生成回答")
+        return await provider.completions(
+            messages, model=model, stream=stream, on_chunk=on_chunk
+        )
 
     # 2. 执行完整的对话流程
-    provider = AIProvider()
-    current_messages = messages.copy()
+    current_messages = list(messages)
+
+    # 详细的消息历史输出仅在DEBUG级别下进行
+    verbose = on_progress is not None and logger.isEnabledFor(logging.DEBUG)
 
     # 打印初始消息
-    if on_progress:
+    if verbose:
         on_progress("=" * 50)
         on_progress("📋 初始对话消息:")
         for i, msg in enumerate(current_messages):
@@ -814,11 +1095,16 @@ async def complete_mcp_workflow(
     for iteration in range(max_iterations):
         if on_progress:
             on_progress(f"🔄 开始第 {iteration + 1} 轮对话")
+        if verbose:
             on_progress(f"📨 当前消息历史长度: {len(current_messages)}")
 
         # 调用LLM生成响应
         llm_response = await provider.completions(
-            current_messages, model=model, mcp_tools=mcp_tools
+            current_messages,
+            model=model,
+            mcp_tools=mcp_tools,
+            stream=stream,
+            on_chunk=on_chunk,
         )
 
         # 打印LLM响应
@@ -846,41 +1132,23 @@ async def complete_mcp_workflow(
                 on_progress(f"       参数: {tool_call.tool.arguments}")
 
         # 执行工具调用
-        tool_results = await execute_mcp_tool_calls(tool_calls, mcp_tools, on_progress)
+        tool_results = await execute_mcp_tool_calls(
+            tool_calls, mcp_tools, on_progress, tool_index
+        )
 
-        # 将LLM响应添加到消息历史
+        # 将LLM响应和工具结果一次性添加到消息历史
+        result_texts = [_tool_result_text(result) for result in tool_results]
         current_messages.append(llm_response.message)
-
-        # 将工具结果添加到消息历史
-        for i, (tool_call, result) in enumerate(zip(tool_calls, tool_results)):
-            # 提取工具结果的文本内容
-            result_text = ""
-            if result.content:
-                for content_item in result.content:
-                    if content_item.get("type") == "text":
-                        result_text += content_item.get("text", "")
-                    else:
-                        result_text += str(content_item)
-
-            # 创建更清晰的工具结果消息，让LLM明确知道工具已执行完成
-            tool_message = ChatMessage(
-                role="user",  # 改为user角色，让LLM更容易理解这是输入信息
-                content=(
-                    f"工具调用结果：\n工具名称：{tool_call.tool.name}\n"
-                    f"执行状态：{'成功' if not result.isError else '失败'}\n"
-                    f"结果内容：\n{result_text}"
-                ),
-                metadata={
-                    "tool_name": tool_call.tool.name,
-                    "tool_result": result.model_dump(),
-                    "is_error": result.isError,
-                    "message_type": "tool_result",
-                },
+        current_messages.extend(
+            _build_tool_result_message(tool_call, result, result_text)
+            for tool_call, result, result_text in zip(
+                tool_calls, tool_results, result_texts
             )
-            current_messages.append(tool_message)
+        )
 
-            # 打印工具结果消息
-            if on_progress:
+        # 打印工具结果消息
+        if verbose:
+            for tool_call, result_text in zip(tool_calls, result_texts):
                 on_progress("📤 添加到消息历史 - 工具结果:")
                 on_progress(f"   🔧 工具: {tool_call.tool.name}")
                 on_progress(
@@ -890,6 +1158,7 @@ async def complete_mcp_workflow(
 
         if on_progress:
             on_progress(f"🔄 第 {iteration + 1} 轮工具调用完成，继续对话")
+        if verbose:
             on_progress(f"📨 更新后消息历史长度: {len(current_messages)}")
 
     # 达到最大迭代次数，返回最后一次响应
@@ -0,0 +1,60 @@
+"""
+命令行入口：chat-mcp
+
+子命令：
+- warmup: 预先启动MCP服务器并获取工具列表，配合CHAT_MCP_TOOL_CACHE=1
+  可在构建镜像或CI准备阶段写入工具列表磁盘缓存
+"""
+
+import argparse
+import asyncio
+from typing import List, Optional
+
+from .mcp_service import close_mcp_service, get_mcp_service
+from .mcp_types import MCPServer
+
+
+async def warmup(command: str, args: List[str]) -> int:
+    """
+    启动MCP服务器并获取一次工具列表
+
+    Args:
+        command: 启动命令
+        args: 命令参数
+
+    Returns:
+        获取到的工具数量
+    """
+    server = MCPServer(id="warmup", name=command, command=command, args=args)
+    try:
+        tools = await get_mcp_service().list_tools(server)
+    finally:
+        await close_mcp_service()
+    return len(tools)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行主函数"""
+    parser = argparse.ArgumentParser(prog="chat-mcp")
+    subparsers = parser.add_subparsers(dest="subcommand", required=True)
+
+    warmup_parser = subparsers.add_parser(
+        "warmup", help="启动MCP服务器并获取工具列表（预热缓存）"
+    )
+    warmup_parser.add_argument("server_command", help="MCP服务器启动命令")
+    warmup_parser.add_argument(
+        "server_args", nargs=argparse.REMAINDER, help="MCP服务器命令参数"
+    )
+
+    options = parser.parse_args(argv)
+
+    if options.subcommand == "warmup":
+        tool_count = asyncio.run(warmup(options.server_command, options.server_args))
+        print(f"✅ 预热完成，获取到 {tool_count} 个工具")
+        return 0 if tool_count else 1
+
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -9,21 +9,57 @@ MCP聊天工具脚手架 - 主要对外API
 这是一个脚手架，其他项目可以直接import使用
 """
 
+import asyncio
 import logging
-from typing import List, Optional, Dict, Any, Callable
+from typing import AsyncIterator, List, Optional, Dict, Any, Callable
 from dotenv import load_dotenv
 
 from .ai_provider import complete_mcp_workflow, register_server_config
 from .mcp_service import get_mcp_service
 from .mcp_types import ChatMessage, MCPServer
 
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
+class BatchingProgressSink:
+    """
+    进度事件缓冲器：累积进度事件，达到数量上限或间隔到期时批量回调
+
+    回调函数接收事件列表，而不是单个事件
+    """
+
+    def __init__(
+        self,
+        on_batch: Callable[[List[Any]], None],
+        max_batch: int = 16,
+        flush_interval: float = 0.02,
+    ):
+        self._on_batch = on_batch
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._events: List[Any] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def __call__(self, event: Any) -> None:
+        """记录一个进度事件"""
+        self._events.append(event)
+        if len(self._events) >= self._max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self._flush_interval, self.flush
+            )
+
+    def flush(self) -> None:
+        """立即回调所有缓冲的事件"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._events:
+            events, self._events = self._events, []
+            self._on_batch(events)
+
+
 class MCPChatTool:
     """
     MCP聊天工具 - 脚手架的主要API类
@@ -89,15 +125,15 @@ class MCPChatTool:
         列出已管理的MCP服务器
 
         Returns:
-            服务器信息列表
+            服务器信息列表（args和env为副本，修改不会影响服务器配置）
         """
         return [
             {
                 "id": server.id,
                 "name": server.name,
                 "command": server.command,
-                "args": server.args,
-                "env": server.env,
+                "args": list(server.args),
+                "env": dict(server.env) if server.env is not None else None,
             }
             for server in self.managed_servers.values()
         ]
@@ -109,6 +145,8 @@ class MCPChatTool:
         system_prompt: Optional[str] = None,
         max_iterations: int = 3,
         on_progress: Optional[Callable] = None,
+        flush_interval_ms: Optional[float] = None,
+        on_chunk: Optional[Callable] = None,
     ) -> Dict[str, Any]:
         """
         使用MCP工具进行完整对话
@@ -119,6 +157,9 @@ class MCPChatTool:
             system_prompt: 系统提示词
             max_iterations: 最大迭代次数
             on_progress: 进度回调函数
+            flush_interval_ms: 进度批量回调间隔（毫秒）；设置后on_progress
+                接收进度事件列表，None表示逐条回调
+            on_chunk: 流式响应回调函数；设置后LLM输出以{"text": 片段}实时回调
 
         Returns:
             包含最终回答、工具调用历史、使用情况的字典
@@ -157,6 +198,14 @@ class MCPChatTool:
 
         messages.append(ChatMessage(role="user", content=user_message))
 
+        # 按需批量回调进度事件
+        progress_sink: Optional[BatchingProgressSink] = None
+        if on_progress and flush_interval_ms is not None:
+            progress_sink = BatchingProgressSink(
+                on_progress, flush_interval=flush_interval_ms / 1000
+            )
+            on_progress = progress_sink
+
         try:
             # 执行完整的MCP工作流程
             response = await complete_mcp_workflow(
@@ -164,6 +213,7 @@ class MCPChatTool:
                 enabled_servers=enabled_servers,
                 max_iterations=max_iterations,
                 on_progress=on_progress,
+                on_chunk=on_chunk,
             )
 
             return {
@@ -183,6 +233,61 @@ class MCPChatTool:
                 "error": str(e),
             }
 
+        finally:
+            if progress_sink is not None:
+                progress_sink.flush()
+
+    async def chat_with_mcp_stream(
+        self,
+        user_message: str,
+        enabled_server_ids: Optional[List[str]] = None,
+        system_prompt: Optional[str] = None,
+        max_iterations: int = 3,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        使用MCP工具进行流式对话
+
+        依次产出事件字典 {"type": ..., "data": ...}：
+        - token: LLM输出的文本片段
+        - progress: 工作流程进度消息（包括工具调用及其结果）
+        - result: 最终结果，内容与chat_with_mcp的返回值相同，总是最后一个事件
+
+        Args:
+            user_message: 用户消息
+            enabled_server_ids: 启用的服务器ID列表，None表示使用所有服务器
+            system_prompt: 系统提示词
+            max_iterations: 最大迭代次数
+        """
+        events: asyncio.Queue = asyncio.Queue()
+
+        def on_chunk(chunk: Dict[str, Any]) -> None:
+            events.put_nowait({"type": "token", "data": chunk["text"]})
+
+        def on_progress(message: Any) -> None:
+            events.put_nowait({"type": "progress", "data": message})
+
+        task = asyncio.ensure_future(
+            self.chat_with_mcp(
+                user_message,
+                enabled_server_ids=enabled_server_ids,
+                system_prompt=system_prompt,
+                max_iterations=max_iterations,
+                on_progress=on_progress,
+                on_chunk=on_chunk,
+            )
+        )
+        # 对话结束后放入哨兵，结束事件循环
+        task.add_done_callback(lambda _: events.put_nowait(None))
+
+        try:
+            while (event := await events.get()) is not None:
+                yield event
+            yield {"type": "result", "data": task.result()}
+        finally:
+            # 调用方提前停止迭代时取消对话
+            if not task.done():
+                task.cancel()
+
 
 # 创建自定义服务器的便捷函数
 def create_server_config(
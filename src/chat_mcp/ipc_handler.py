@@ -3,10 +3,21 @@ IPC通信处理模块：模拟Cherry Studio的IPC通信机制
 提供MCP相关的操作，包括服务器管理、工具列表、工具调用等
 """
 
+import asyncio
+import json
 import logging
-from typing import Dict, List, Optional, Any
+from dataclasses import asdict, is_dataclass
+from typing import Dict, List, Optional, Any, Tuple
 from enum import Enum
 
+from pydantic import BaseModel
+
+try:
+    # 可选依赖：orjson序列化更快，且直接输出bytes
+    import orjson as _orjson
+except ImportError:  # 未安装orjson时回退到标准库
+    _orjson = None
+
 from .mcp_types import MCPServer, MCPTool, MCPCallToolResponse
 from .mcp_service import get_mcp_service
 from .ai_provider import register_server_config
@@ -20,6 +31,7 @@ class IpcChannel(Enum):
     # MCP相关通道
     MCP_LIST_TOOLS = "mcp:list_tools"
     MCP_CALL_TOOL = "mcp:call_tool"
+    MCP_CALL_TOOLS = "mcp:call_tools"
     MCP_ADD_SERVER = "mcp:add_server"
     MCP_REMOVE_SERVER = "mcp:remove_server"
     MCP_RESTART_SERVER = "mcp:restart_server"
@@ -53,12 +65,12 @@ class MCPIPCHandler:
             工具列表
         """
         try:
-            logger.info(f"[IPC] Listing tools for server: {server.name}")
+            logger.info("[IPC] Listing tools for server: %s", server.name)
             tools = await self.mcp_service.list_tools(server)
-            logger.info(f"[IPC] Found {len(tools)} tools for server: {server.name}")
+            logger.info("[IPC] Found %s tools for server: %s", len(tools), server.name)
             return tools
         except Exception as e:
-            logger.error(f"[IPC] Failed to list tools for server {server.name}: {e}")
+            logger.error("[IPC] Failed to list tools for server %s: %s", server.name, e)
             return []
 
     async def call_tool(self, request: Dict[str, Any]) -> MCPCallToolResponse:
@@ -80,7 +92,7 @@ class MCPIPCHandler:
             if not server or not tool_name:
                 raise ValueError("Missing required parameters: server or name")
 
-            logger.info(f"[IPC] Calling tool: {tool_name} on server: {server.name}")
+            logger.info("[IPC] Calling tool: %s on server: %s", tool_name, server.name)
 
             # 调用工具
             result = await self.mcp_service.call_tool(server, tool_name, arguments)
@@ -93,17 +105,32 @@ class MCPIPCHandler:
 
             response = MCPCallToolResponse(content=content, isError=False)
 
-            logger.info(f"[IPC] Tool called successfully: {tool_name}")
+            logger.info("[IPC] Tool called successfully: %s", tool_name)
             return response
 
         except Exception as e:
-            logger.error(f"[IPC] Tool call failed: {e}")
-            return MCPCallToolResponse(
+            logger.error("[IPC] Tool call failed: %s", e)
+            return MCPCallToolResponse.model_construct(
                 content=[{"type": "text", "text": f"IPC tool call failed: {str(e)}"}],
                 isError=True,
             )
 
-    async def add_server(self, server: MCPServer) -> bool:
+    async def call_tools(
+        self, requests: List[Dict[str, Any]]
+    ) -> List[MCPCallToolResponse]:
+        """
+        批量调用MCP工具，一次IPC请求完成多个工具调用
+
+        Args:
+            requests: 工具调用请求列表，每项格式与call_tool相同
+
+        Returns:
+            与requests顺序一致的工具调用响应列表
+        """
+        # call_tool内部将异常转换为错误响应，各调用并发执行
+        return list(await asyncio.gather(*map(self.call_tool, requests)))
+
+    def add_server(self, server: MCPServer) -> bool:
         """
         添加MCP服务器
 
@@ -116,13 +143,13 @@ class MCPIPCHandler:
         try:
             # 注册服务器配置
             register_server_config(server)
-            logger.info(f"[IPC] Server added: {server.name}")
+            logger.info("[IPC] Server added: %s", server.name)
             return True
         except Exception as e:
-            logger.error(f"[IPC] Failed to add server {server.name}: {e}")
+            logger.error("[IPC] Failed to add server %s: %s", server.name, e)
             return False
 
-    async def remove_server(self, server_id: str) -> bool:
+    def remove_server(self, server_id: str) -> bool:
         """
         移除MCP服务器
 
@@ -134,13 +161,13 @@ class MCPIPCHandler:
         """
         try:
             # 这里可以添加实际的移除逻辑
-            logger.info(f"[IPC] Server removed: {server_id}")
+            logger.info("[IPC] Server removed: %s", server_id)
             return True
         except Exception as e:
-            logger.error(f"[IPC] Failed to remove server {server_id}: {e}")
+            logger.error("[IPC] Failed to remove server %s: %s", server_id, e)
             return False
 
-    async def restart_server(self, server_id: str) -> bool:
+    def restart_server(self, server_id: str) -> bool:
         """
         重启MCP服务器
 
@@ -152,13 +179,13 @@ class MCPIPCHandler:
         """
         try:
             # 这里可以添加实际的重启逻辑
-            logger.info(f"[IPC] Server restarted: {server_id}")
+            logger.info("[IPC] Server restarted: %s", server_id)
             return True
         except Exception as e:
-            logger.error(f"[IPC] Failed to restart server {server_id}: {e}")
+            logger.error("[IPC] Failed to restart server %s: %s", server_id, e)
             return False
 
-    async def stop_server(self, server_id: str) -> bool:
+    def stop_server(self, server_id: str) -> bool:
         """
         停止MCP服务器
 
@@ -170,10 +197,10 @@ class MCPIPCHandler:
         """
         try:
             # 这里可以添加实际的停止逻辑
-            logger.info(f"[IPC] Server stopped: {server_id}")
+            logger.info("[IPC] Server stopped: %s", server_id)
             return True
         except Exception as e:
-            logger.error(f"[IPC] Failed to stop server {server_id}: {e}")
+            logger.error("[IPC] Failed to stop server %s: %s", server_id, e)
             return False
 
 
@@ -189,6 +216,18 @@ def get_ipc_handler() -> MCPIPCHandler:
     return _ipc_handler
 
 
+# IPC通道 -> (处理器方法名, 参数的关键字名称, 是否为协程方法)
+_IPC_ROUTES: Dict[str, Tuple[str, str, bool]] = {
+    IpcChannel.MCP_LIST_TOOLS.value: ("list_tools", "server", True),
+    IpcChannel.MCP_CALL_TOOL.value: ("call_tool", "request", True),
+    IpcChannel.MCP_CALL_TOOLS.value: ("call_tools", "requests", True),
+    IpcChannel.MCP_ADD_SERVER.value: ("add_server", "server", False),
+    IpcChannel.MCP_REMOVE_SERVER.value: ("remove_server", "server_id", False),
+    IpcChannel.MCP_RESTART_SERVER.value: ("restart_server", "server_id", False),
+    IpcChannel.MCP_STOP_SERVER.value: ("stop_server", "server_id", False),
+}
+
+
 async def handle_ipc_request(channel: str, *args, **kwargs) -> Any:
     """
     处理IPC请求的统一入口
@@ -205,36 +244,48 @@ async def handle_ipc_request(channel: str, *args, **kwargs) -> Any:
     handler = get_ipc_handler()
 
     try:
-        if channel == IpcChannel.MCP_LIST_TOOLS.value:
-            server = args[0] if args else kwargs.get("server")
-            return await handler.list_tools(server)
+        route = _IPC_ROUTES.get(channel)
+        if route is None:
+            raise ValueError(f"Unknown IPC channel: {channel}")
 
-        elif channel == IpcChannel.MCP_CALL_TOOL.value:
-            request = args[0] if args else kwargs.get("request")
-            return await handler.call_tool(request)
+        method_name, param_name, is_async = route
+        param = args[0] if args else kwargs.get(param_name)
+        result = getattr(handler, method_name)(param)
+        # 仅修改本地状态的操作是同步方法，无需await
+        return await result if is_async else result
 
-        elif channel == IpcChannel.MCP_ADD_SERVER.value:
-            server = args[0] if args else kwargs.get("server")
-            return await handler.add_server(server)
+    except Exception as e:
+        logger.error("[IPC] Error handling request on channel %s: %s", channel, e)
+        raise
 
-        elif channel == IpcChannel.MCP_REMOVE_SERVER.value:
-            server_id = args[0] if args else kwargs.get("server_id")
-            return await handler.remove_server(server_id)
 
-        elif channel == IpcChannel.MCP_RESTART_SERVER.value:
-            server_id = args[0] if args else kwargs.get("server_id")
-            return await handler.restart_server(server_id)
+def _json_default(value: Any) -> Any:
+    """
+    JSON编码器无法直接序列化的类型的转换函数
 
-        elif channel == IpcChannel.MCP_STOP_SERVER.value:
-            server_id = args[0] if args else kwargs.get("server_id")
-            return await handler.stop_server(server_id)
+    嵌套在列表、字典中的对象同样会经过该函数；orjson原生支持dataclass，
+    只有标准库json需要转换dataclass（如MCPServer）
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
 
-        else:
-            raise ValueError(f"Unknown IPC channel: {channel}")
 
-    except Exception as e:
-        logger.error(f"[IPC] Error handling request on channel {channel}: {e}")
-        raise
+def serialize_ipc_result(result: Any) -> bytes:
+    """
+    将IPC处理结果序列化为UTF-8编码的JSON，供需要跨进程传输的调用方使用
+
+    Args:
+        result: handle_ipc_request的返回值
+
+    Returns:
+        JSON字节串
+    """
+    if _orjson is not None:
+        return _orjson.dumps(result, default=_json_default)
+    return json.dumps(result, default=_json_default, ensure_ascii=False).encode("utf-8")
 
 
 # 为了方便使用，提供类似Cherry Studio的window.api.mcp接口
@@ -254,6 +305,13 @@ class WindowAPIMCP:
         """调用工具"""
         return await handle_ipc_request(IpcChannel.MCP_CALL_TOOL.value, request)
 
+    @staticmethod
+    async def callTools(
+        requests: List[Dict[str, Any]],
+    ) -> List[MCPCallToolResponse]:
+        """批量调用工具"""
+        return await handle_ipc_request(IpcChannel.MCP_CALL_TOOLS.value, requests)
+
     @staticmethod
     async def addServer(server: MCPServer) -> bool:
         """添加服务器"""
@@ -3,10 +3,11 @@ MCP聊天处理器：内部的聊天处理逻辑
 这不是对外API，对外API请使用easy_chat.py
 """
 
-from typing import List, Optional
+import asyncio
+from typing import AbstractSet, Collection, Dict, List, Optional
 from .mcp_types import MCPServer, MCPTool, ChatRequest, ChatResponse, ChatMessage
-from .mcp_service import MCPService
-from .ai_provider import AIProvider
+from .mcp_service import get_mcp_service
+from .ai_provider import get_ai_provider
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,7 +20,26 @@ class MCPToolCollector:
     """
 
     def __init__(self):
-        self.mcp_service = MCPService()
+        self.mcp_service = get_mcp_service()
+        # 工具名称 -> 工具，随最近一次collect_mcp_tools更新
+        self._index: Dict[str, MCPTool] = {}
+
+    @property
+    def tool_index(self) -> Dict[str, MCPTool]:
+        """最近一次收集到的工具名称索引"""
+        return self._index
+
+    def get_tool(self, name: str) -> Optional[MCPTool]:
+        """
+        按名称查找最近一次收集到的工具
+
+        Args:
+            name: 工具名称
+
+        Returns:
+            对应的MCP工具，未找到时返回None
+        """
+        return self._index.get(name)
 
     async def collect_mcp_tools(
         self, enabled_mcps: Optional[List[MCPServer]]
@@ -36,56 +56,73 @@ class MCPToolCollector:
 
         """
         mcp_tools: List[MCPTool] = []
+        self._index = {}
 
         if not enabled_mcps or len(enabled_mcps) == 0:
             logger.info("[MCP] No enabled MCP servers found")
             return mcp_tools
 
         logger.info(
-            f"[MCP] Collecting tools from {len(enabled_mcps)} enabled MCP servers"
+            "[MCP] Collecting tools from %s enabled MCP servers", len(enabled_mcps)
+        )
+
+        # 并发收集每个启用的MCP服务器的工具，结果顺序与服务器顺序一致
+        per_server_tools = await asyncio.gather(
+            *(self._collect_from_server(mcp_server) for mcp_server in enabled_mcps)
         )
 
-        # 遍历每个启用的MCP服务器
-        for mcp_server in enabled_mcps:
-            try:
-                logger.info(f"[MCP] Getting tools from server: {mcp_server.name}")
+        # 建立名称索引并添加到工具列表（同名工具保留先收集到的）
+        for available_tools in per_server_tools:
+            for tool in available_tools:
+                self._index.setdefault(tool.name, tool)
+            mcp_tools.extend(available_tools)
 
-                # 从MCP服务器获取工具列表
-                tools = await self.mcp_service.list_tools(mcp_server)
+        logger.info(
+            "[MCP] Collected %s total tools from enabled servers", len(mcp_tools)
+        )
+        return mcp_tools
 
-                # 过滤被禁用的工具
-                available_tools = self._filter_disabled_tools(
-                    tools, mcp_server.disabled_tools
-                )
+    async def _collect_from_server(self, mcp_server: MCPServer) -> List[MCPTool]:
+        """
+        从单个MCP服务器获取、过滤并绑定工具，失败时返回空列表
 
-                logger.info(
-                    f"[MCP] Server {mcp_server.name}: {len(tools)} total tools, "
-                    f"{len(available_tools)} available"
-                )
+        Args:
+            mcp_server: MCP服务器配置
 
-                # 添加到工具列表
-                mcp_tools.extend(available_tools)
+        Returns:
+            该服务器的可用工具列表
+        """
+        try:
+            tools = await self.mcp_service.list_tools(mcp_server)
+        except Exception as e:
+            logger.error(
+                "[MCP] Failed to get tools from server %s: %s", mcp_server.name, e
+            )
+            return []
 
-            except Exception as e:
-                logger.error(
-                    f"[MCP] Failed to get tools from server {mcp_server.name}: {e}"
-                )
-                continue
+        # 过滤被禁用的工具
+        available_tools = self._filter_disabled_tools(
+            tools, mcp_server.disabled_tools_set
+        )
 
         logger.info(
-            f"[MCP] Collected {len(mcp_tools)} total tools from enabled servers"
+            "[MCP] Server %s: %s total tools, %s available",
+            mcp_server.name,
+            len(tools),
+            len(available_tools),
         )
-        return mcp_tools
+
+        return available_tools
 
     def _filter_disabled_tools(
-        self, tools: List[MCPTool], disabled_tools: Optional[List[str]]
+        self, tools: List[MCPTool], disabled_tools: Optional[Collection[str]]
     ) -> List[MCPTool]:
         """
         过滤被禁用的工具
 
         Args:
             tools: 工具列表
-            disabled_tools: 被禁用的工具名称列表
+            disabled_tools: 被禁用的工具名称集合
 
         Returns:
             过滤后的工具列表
@@ -93,13 +130,20 @@ class MCPToolCollector:
         if not disabled_tools:
             return tools
 
+        # 列表等非集合类型先转为集合，保证成员判断为O(1)
+        if not isinstance(disabled_tools, AbstractSet):
+            disabled_tools = frozenset(disabled_tools)
+
         # 过滤掉被禁用的工具
         available_tools = [tool for tool in tools if tool.name not in disabled_tools]
 
         filtered_count = len(tools) - len(available_tools)
-        if filtered_count > 0:
+        # 排序禁用列表的开销仅在INFO级别开启时产生
+        if filtered_count > 0 and logger.isEnabledFor(logging.INFO):
             logger.info(
-                f"[MCP] Filtered out {filtered_count} disabled tools: {disabled_tools}"
+                "[MCP] Filtered out %s disabled tools: %s",
+                filtered_count,
+                sorted(disabled_tools),
             )
 
         return available_tools
@@ -112,7 +156,8 @@ class ChatMCPClient:
 
     def __init__(self):
         self.tool_collector = MCPToolCollector()
-        self.ai_provider = AIProvider()
+        # 复用共享的AIProvider，避免每个客户端重复读取环境配置
+        self.ai_provider = get_ai_provider()
 
     async def collect_tools_from_request(self, request: ChatRequest) -> List[MCPTool]:
         """
@@ -138,26 +183,24 @@ class ChatMCPClient:
 
 
         """
-        logger.info(f"[Chat] Starting chat with model: {request.model}")
+        logger.info("[Chat] Starting chat with model: %s", request.model)
 
         # Step1: 收集MCP工具
         mcp_tools = await self.collect_tools_from_request(request)
-        logger.info(f"[Chat] Collected {len(mcp_tools)} MCP tools")
+        logger.info("[Chat] Collected %s MCP tools", len(mcp_tools))
 
         # 确保有系统消息，如果没有则添加默认的
-        messages = request.messages.copy()
-        has_system_message = any(msg.role == "system" for msg in messages)
-
-        if not has_system_message:
-            # 添加默认系统消息
+        messages = request.messages
+        if not any(msg.role == "system" for msg in messages):
+            # 添加默认系统消息，仅在需要插入时复制，不修改请求中的原列表
             system_message = ChatMessage(
                 role="system", content="You are a helpful assistant."
             )
-            messages.insert(0, system_message)
+            messages = [system_message, *messages]
             logger.info("[Chat] Added default system message")
 
         # Step2: 将MCP工具传递给AI Provider
-        logger.info(f"[Chat] Calling AI provider with {len(mcp_tools)} MCP tools")
+        logger.info("[Chat] Calling AI provider with %s MCP tools", len(mcp_tools))
 
         try:
             response = await self.ai_provider.completions(
@@ -185,14 +228,14 @@ class ChatMCPClient:
 
             logger.info("[Chat] AI response generated successfully")
             logger.info(
-                "[Chat] Tool calls detected: "
-                f"{len(response.message.tool_calls) if response.message.tool_calls else 0}"
+                "[Chat] Tool calls detected: %s",
+                len(response.message.tool_calls) if response.message.tool_calls else 0,
             )
 
             return response
 
         except Exception as e:
-            logger.error(f"[Chat] Chat execution failed: {e}")
+            logger.error("[Chat] Chat execution failed: %s", e)
 
             # 返回错误响应
             error_message = ChatMessage(
@@ -2,24 +2,347 @@
 MCP服务模块：负责管理MCP服务器连接和工具操作
 """
 
+import asyncio
+import functools
+import hashlib
+import itertools
+import json
 import logging
-from typing import Dict, List, Optional, Any
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 import time
-import hashlib
 
-# 修正导入方式
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
+try:
+    # 可选依赖：orjson读写磁盘缓存更快，其JSONDecodeError是ValueError的子类
+    import orjson as _orjson
+except ImportError:  # 未安装orjson时回退到标准库
+    _orjson = None
 
 from .mcp_types import MCPServer, MCPTool
 
+if TYPE_CHECKING:
+    from mcp import ClientSession
+
 # 设置日志
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# 服务器缓存键：(命令, 参数)
+ServerKey = Tuple[str, Tuple[str, ...]]
+# 工具列表缓存键：(服务器键, 被禁用工具集合)
+ToolCacheKey = Tuple[ServerKey, FrozenSet[str]]
+
+
+# 工具ID计数器
+_id_counter = itertools.count()
+
+# MCP SDK在连接断开时抛出的McpError错误码
+_CONNECTION_CLOSED = -32000
+
+# 工具列表磁盘缓存的最长有效期（秒）
+_DISK_CACHE_MAX_AGE = 24 * 60 * 60
+
+
+@functools.cache
+def _mcp_client() -> Tuple[Any, Any, Any]:
+    """按需导入MCP SDK的stdio客户端，避免仅使用类型时的导入开销"""
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    return ClientSession, StdioServerParameters, stdio_client
+
 
 def generate_id() -> str:
     """生成唯一ID"""
-    return f"f{int(time.time() * 1000000) % 1000000:06d}"
+    return f"f{next(_id_counter):06d}"
+
+
+@functools.cache
+def _transport_errors() -> Tuple[type, ...]:
+    """stdio连接断开时可能抛出的异常类型"""
+    import anyio
+
+    return (
+        OSError,
+        anyio.ClosedResourceError,
+        anyio.BrokenResourceError,
+        anyio.EndOfStream,
+    )
+
+
+def _is_connection_error(error: BaseException) -> bool:
+    """
+    判断请求失败后会话是否已不可用
+
+    取消等非Exception异常发生时请求可能只发出了一半，同样视为连接不可用；
+    服务器返回的业务错误不影响会话本身
+
+    Args:
+        error: 请求抛出的异常
+
+    Returns:
+        bool: 会话应被丢弃时返回True
+    """
+    if not isinstance(error, Exception):
+        return True
+    if isinstance(error, _transport_errors()):
+        return True
+    error_data = getattr(error, "error", None)
+    return getattr(error_data, "code", None) == _CONNECTION_CLOSED
+
+
+# (命令, PATH) -> 可执行文件路径；只缓存找到的结果，命令安装后无需重启即可使用
+_command_paths: Dict[Tuple[str, Optional[str]], str] = {}
+
+
+def _resolve_command(server: MCPServer) -> Optional[str]:
+    """
+    解析服务器命令的可执行文件路径
+
+    服务器配置了PATH环境变量时按该PATH查找，与启动子进程时的查找一致
+
+    Args:
+        server: MCP服务器配置
+
+    Returns:
+        可执行文件路径，找不到时返回None
+    """
+    search_path = server.env.get("PATH") if server.env else None
+    key = (server.command, search_path)
+    command_path = _command_paths.get(key)
+    if command_path is None:
+        command_path = shutil.which(server.command, path=search_path)
+        if command_path is not None:
+            _command_paths[key] = command_path
+    return command_path
+
+
+def _disk_cache_path(server: MCPServer) -> Optional[Path]:
+    """
+    获取服务器工具列表的磁盘缓存路径
+
+    仅在环境变量CHAT_MCP_TOOL_CACHE=1时启用；缓存键包含命令、参数和环境变量。
+    npx、uvx等启动器的缓存键无法反映服务器程序的更新，因此缓存文件
+    超过_DISK_CACHE_MAX_AGE后失效，后台刷新也总是直接请求服务器
+
+    Args:
+        server: MCP服务器配置
+
+    Returns:
+        缓存文件路径，未启用时返回None
+    """
+    if os.getenv("CHAT_MCP_TOOL_CACHE") != "1":
+        return None
+
+    env_items = sorted(server.env.items()) if server.env else []
+    key_data = f"{server.command}|{server.args}|{env_items}".encode()
+    digest = hashlib.blake2b(key_data, digest_size=16).hexdigest()
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(cache_home) / "chat_mcp" / "tools" / f"{digest}.json"
+
+
+def _read_disk_cache(cache_path: Path) -> Optional[List[Dict[str, Any]]]:
+    """读取磁盘缓存的工具定义，不存在、过期或损坏时返回None"""
+    try:
+        if time.time() - os.stat(cache_path).st_mtime > _DISK_CACHE_MAX_AGE:
+            return None
+        with open(cache_path, "rb") as f:
+            data = f.read()
+        tool_specs = _orjson.loads(data) if _orjson is not None else json.loads(data)
+    except (OSError, ValueError):
+        return None
+    return tool_specs if isinstance(tool_specs, list) else None
+
+
+def _write_disk_cache(cache_path: Path, tool_specs: List[Dict[str, Any]]) -> None:
+    """原子地写入工具定义缓存（先写临时文件再替换）"""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        try:
+            if _orjson is not None:
+                data = _orjson.dumps(tool_specs)
+            else:
+                data = json.dumps(tool_specs, ensure_ascii=False).encode("utf-8")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError as error:
+        logger.warning("[MCP] 写入工具列表磁盘缓存失败: %s", error)
+
+
+class MCPSessionPool:
+    """
+    MCP会话池
+
+    每个服务器最多维护pool_size个已初始化的会话，按需创建。
+    调用方借出会话独占使用，用完归还；连接断开的会话被丢弃并关闭。
+
+    每个会话由一个后台任务持有：连接的上下文在该任务内进入和退出
+    （anyio要求取消作用域在同一任务中退出），关闭时通知该任务并等待其结束。
+    """
+
+    def __init__(self, pool_size: int = 4):
+        self._pool_size = max(1, pool_size)
+        # 服务器键 -> 空闲会话
+        self._idle: Dict[ServerKey, List["ClientSession"]] = {}
+        # 服务器键 -> 已创建（含借出中和创建中）的会话数
+        self._opened: Dict[ServerKey, int] = {}
+        self._conditions: Dict[ServerKey, asyncio.Condition] = {}
+        # 会话 -> (通知持有任务关闭的事件, 持有任务)
+        self._owners: Dict[
+            "ClientSession", Tuple[asyncio.Event, "asyncio.Task[None]"]
+        ] = {}
+
+    def _condition(self, server_key: ServerKey) -> asyncio.Condition:
+        """获取服务器键对应的条件变量"""
+        condition = self._conditions.get(server_key)
+        if condition is None:
+            condition = self._conditions[server_key] = asyncio.Condition()
+        return condition
+
+    async def acquire(
+        self, server_key: ServerKey, server: MCPServer
+    ) -> "ClientSession":
+        """
+        借出一个会话，没有空闲会话且未达上限时新建，否则等待归还
+
+        Args:
+            server_key: 服务器键
+            server: MCP服务器配置
+
+        Returns:
+            ClientSession: 已初始化的会话
+        """
+        condition = self._condition(server_key)
+        async with condition:
+            while True:
+                idle = self._idle.get(server_key)
+                if idle:
+                    return idle.pop()
+                if self._opened.get(server_key, 0) < self._pool_size:
+                    self._opened[server_key] = self._opened.get(server_key, 0) + 1
+                    break
+                await condition.wait()
+
+        # 在锁外建立连接，避免阻塞其他借出/归还
+        try:
+            return await self._open(server)
+        except BaseException:
+            async with condition:
+                self._opened[server_key] -= 1
+                condition.notify()
+            raise
+
+    async def release(self, server_key: ServerKey, session: "ClientSession") -> None:
+        """归还会话"""
+        condition = self._condition(server_key)
+        async with condition:
+            self._idle.setdefault(server_key, []).append(session)
+            condition.notify()
+
+    async def discard(self, server_key: ServerKey, session: "ClientSession") -> None:
+        """丢弃并关闭连接已断开的会话"""
+        condition = self._condition(server_key)
+        async with condition:
+            self._opened[server_key] -= 1
+            condition.notify()
+        await self._close(session)
+
+    async def close_all(self) -> None:
+        """关闭所有空闲会话"""
+        for server_key, idle in list(self._idle.items()):
+            self._idle[server_key] = []
+            self._opened[server_key] -= len(idle)
+            for session in idle:
+                await self._close(session)
+
+    async def _open(self, server: MCPServer) -> "ClientSession":
+        """启动持有会话的后台任务，等待会话初始化完成"""
+        ready: "asyncio.Future[ClientSession]" = (
+            asyncio.get_running_loop().create_future()
+        )
+        closing = asyncio.Event()
+        task = asyncio.create_task(self._own_session(server, ready, closing))
+        try:
+            session = await ready
+        except BaseException:
+            task.cancel()
+            await asyncio.wait([task])
+            raise
+
+        logger.info("[MCP] 成功连接服务器: %s", server.name)
+        self._owners[session] = (closing, task)
+        return session
+
+    async def _own_session(
+        self,
+        server: MCPServer,
+        ready: "asyncio.Future[ClientSession]",
+        closing: asyncio.Event,
+    ) -> None:
+        """
+        会话持有任务：启动服务器进程、初始化会话，然后等待关闭通知
+
+        Args:
+            server: MCP服务器配置
+            ready: 会话初始化完成或失败时设置的结果
+            closing: 收到通知后退出连接上下文
+        """
+        client_session, stdio_server_parameters, stdio_client = _mcp_client()
+
+        # 创建服务器参数
+        server_params = stdio_server_parameters(
+            command=server.command, args=server.args, env=server.env
+        )
+
+        try:
+            async with stdio_client(server_params) as (read, write):
+                async with client_session(read, write) as session:
+                    # 初始化会话
+                    await session.initialize()
+                    # 调用方已取消等待时ready已完成，随后本任务也会被取消
+                    if not ready.done():
+                        ready.set_result(session)
+                    await closing.wait()
+        except asyncio.CancelledError:
+            if not ready.done():
+                ready.cancel()
+            raise
+        except Exception as error:
+            if not ready.done():
+                ready.set_exception(error)
+            else:
+                logger.warning("[MCP] 关闭会话失败: %s", server.name, exc_info=error)
+
+    async def _close(self, session: "ClientSession") -> None:
+        """通知持有任务关闭会话及其连接，并等待其结束"""
+        owner = self._owners.pop(session, None)
+        if owner is None:
+            return
+        closing, task = owner
+        closing.set()
+        await asyncio.wait([task])
 
 
 class MCPService:
@@ -27,77 +350,194 @@ class MCPService:
     MCP服务管理类
 
     管理MCP服务器连接和工具列表获取，提供缓存功能
+    通过会话池复用长连接，避免每次调用都启动进程并握手
     """
 
-    def __init__(self):
-        self._tool_cache: Dict[str, List[MCPTool]] = {}
-        self._cache_ttl: Dict[str, float] = {}
-        self._cache_duration = 5 * 60  # 5分钟缓存
+    def __init__(self, pool_size: int = 4):
+        # 缓存的是已过滤禁用工具的列表，命中时直接返回
+        self._tool_cache: Dict[ToolCacheKey, List[MCPTool]] = {}
+        # 缓存超过该时长后在后台刷新，调用方仍直接使用已缓存的列表
+        self._refresh_threshold = 4 * 60
+        # 缓存键 -> 需要刷新的时间点（time.monotonic）
+        self._refresh_deadline: Dict[ToolCacheKey, float] = {}
+        # 每个服务器的会话池，复用已启动并初始化的子进程
+        self._pool_size = pool_size
+        self._session_pool = MCPSessionPool(pool_size)
+        # 进行中的工具列表请求，合并同一服务器的并发获取
+        self._inflight: Dict[ToolCacheKey, "asyncio.Future[List[MCPTool]]"] = {}
+        # 会话池和进行中的请求所属的事件循环
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _bind_loop(self) -> None:
+        """
+        将会话池和进行中的请求绑定到当前事件循环
 
-    def _get_server_key(self, server: MCPServer) -> str:
+        会话、条件变量和Future都属于创建它们的事件循环；事件循环变化时
+        （如多次调用asyncio.run）丢弃旧状态，旧循环关闭时已取消其会话持有任务
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        if self._loop is not None:
+            logger.debug("[MCP] 事件循环已变化，重建会话池")
+        self._loop = loop
+        self._session_pool = MCPSessionPool(self._pool_size)
+        self._inflight = {}
+
+    def _get_server_key(self, server: MCPServer) -> ServerKey:
         """获取服务器缓存键"""
-        server_data = f"{server.command}:{':'.join(server.args)}"
-        return hashlib.md5(server_data.encode()).hexdigest()
+        return (server.command, tuple(server.args))
+
+    def _get_tool_cache_key(self, server: MCPServer) -> ToolCacheKey:
+        """获取工具列表缓存键，不同的禁用工具配置分别缓存"""
+        return (self._get_server_key(server), server.disabled_tools_set)
+
+    def invalidate(self, server: MCPServer) -> None:
+        """
+        清除服务器的工具列表缓存（服务器配置变更时调用）
+
+        Args:
+            server: MCP服务器配置
+        """
+        server_key = self._get_server_key(server)
+        for cache_key in [key for key in self._tool_cache if key[0] == server_key]:
+            self._tool_cache.pop(cache_key, None)
+            self._refresh_deadline.pop(cache_key, None)
+
+    async def _with_session(
+        self,
+        server: MCPServer,
+        operation: Callable[["ClientSession"], Awaitable[_T]],
+        idempotent: bool = False,
+    ) -> _T:
+        """
+        借出服务器会话执行操作
+
+        建立连接失败时重试一次；请求发出后不再重试，避免非幂等的工具被执行两次。
+        仅当操作幂等（如获取工具列表）且借出的会话连接已断开时，换新会话重试一次
+
+        Args:
+            server: MCP服务器配置
+            operation: 接收会话并执行请求的协程函数
+            idempotent: 操作是否可以安全地重复执行
+
+        Returns:
+            操作的返回值
+        """
+        try:
+            return await self._run_pooled(server, operation)
+        except Exception as error:
+            if not (idempotent and _is_connection_error(error)):
+                raise
+            logger.warning(
+                "[MCP] 会话连接已断开，重新连接: %s", server.name, exc_info=error
+            )
+        return await self._run_pooled(server, operation)
+
+    async def _acquire(
+        self, server_key: ServerKey, server: MCPServer
+    ) -> "ClientSession":
+        """借出会话，建立连接失败时重试一次（此时请求尚未发出）"""
+        try:
+            return await self._session_pool.acquire(server_key, server)
+        except Exception as error:
+            logger.warning("[MCP] 建立会话失败，重试: %s", server.name, exc_info=error)
+        return await self._session_pool.acquire(server_key, server)
+
+    async def _run_pooled(
+        self,
+        server: MCPServer,
+        operation: Callable[["ClientSession"], Awaitable[_T]],
+    ) -> _T:
+        """借出会话执行操作，完成后归还；仅在连接断开时丢弃会话"""
+        self._bind_loop()
+        server_key = self._get_server_key(server)
+        session = await self._acquire(server_key, server)
+        try:
+            result = await operation(session)
+        except BaseException as error:
+            if _is_connection_error(error):
+                await self._session_pool.discard(server_key, session)
+            else:
+                await self._session_pool.release(server_key, session)
+            raise
+        await self._session_pool.release(server_key, session)
+        return result
 
-    async def _list_tools_impl(self, server: MCPServer) -> List[MCPTool]:
+    async def aclose(self) -> None:
+        """关闭所有服务器会话"""
+        self._bind_loop()
+        await self._session_pool.close_all()
+
+    async def _list_tools_impl(
+        self, server: MCPServer, use_disk_cache: bool = True
+    ) -> Optional[List[MCPTool]]:
         """
         从MCP服务器获取工具列表的实现
 
         Args:
             server: MCP服务器配置
+            use_disk_cache: 是否先读取磁盘缓存；为False时总是请求服务器并更新缓存
 
         Returns:
-            List[MCPTool]: 工具列表
+            Optional[List[MCPTool]]: 工具列表，获取失败时返回None
         """
-        logger.info(f"[MCP] 正在获取工具列表: {server.name}")
+        logger.info("[MCP] 正在获取工具列表: %s", server.name)
+
+        # 命令不存在时无需尝试启动进程
+        if _resolve_command(server) is None:
+            logger.warning(
+                "[MCP] 找不到服务器命令: %s (%s)", server.command, server.name
+            )
+            return None
 
         try:
-            # 创建服务器参数
-            server_params = StdioServerParameters(
-                command=server.command, args=server.args, env=server.env
+            # 启用磁盘缓存且缓存未过期时，直接读取上次的工具定义
+            cache_path = _disk_cache_path(server)
+            tool_specs = (
+                _read_disk_cache(cache_path) if cache_path and use_disk_cache else None
             )
 
-            # 使用正确的连接方式
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    # 初始化会话
-                    await session.initialize()
-                    logger.info(f"[MCP] 成功连接服务器: {server.name}")
-
-                    # 获取工具列表
-                    tools_response = await session.list_tools()
-                    tools = (
-                        tools_response.tools if hasattr(tools_response, "tools") else []
-                    )
-
-                    server_tools: List[MCPTool] = []
-
-                    for tool in tools:
-                        # 创建MCPTool对象
-                        server_tool = MCPTool(
-                            id=generate_id(),
-                            name=tool.name,
-                            description=tool.description or "",
-                            inputSchema=tool.inputSchema or {},
-                            server_id=server.id,
-                            server_name=server.name,
-                        )
-                        server_tools.append(server_tool)
-
-                    logger.info(
-                        f"[MCP] 获取到 {len(server_tools)} 个工具: {server.name}"
-                    )
-                    return server_tools
+            if tool_specs is None:
+                # 获取工具列表
+                tools_response = await self._with_session(
+                    server, lambda session: session.list_tools(), idempotent=True
+                )
+                tools = tools_response.tools if hasattr(tools_response, "tools") else []
+                tool_specs = [
+                    {
+                        "name": tool.name,
+                        "description": tool.description or "",
+                        "inputSchema": tool.inputSchema or {},
+                    }
+                    for tool in tools
+                ]
+                if cache_path:
+                    _write_disk_cache(cache_path, tool_specs)
+            else:
+                logger.debug("[MCP] 使用磁盘缓存的工具列表: %s", server.name)
+
+            # 创建MCPTool对象（字段来自SDK已校验的Tool或其缓存，跳过重复校验）
+            server_tools = [
+                MCPTool.model_construct(
+                    id=generate_id(),
+                    server_id=server.id,
+                    server_name=server.name,
+                    **tool_spec,
+                )
+                for tool_spec in tool_specs
+            ]
+
+            logger.info("[MCP] 获取到 %s 个工具: %s", len(server_tools), server.name)
+            return server_tools
 
         except Exception as error:
-            logger.error(f"[MCP] 获取工具列表失败: {server.name}", exc_info=error)
-            return []
+            logger.error("[MCP] 获取工具列表失败: %s", server.name, exc_info=error)
+            return None
 
-    def _is_cache_valid(self, server_key: str) -> bool:
-        """检查缓存是否有效"""
-        if server_key not in self._cache_ttl:
-            return False
-        return time.time() - self._cache_ttl[server_key] < self._cache_duration
+    def _needs_refresh(self, cache_key: ToolCacheKey) -> bool:
+        """检查缓存是否需要刷新"""
+        return time.monotonic() >= self._refresh_deadline.get(cache_key, 0.0)
 
     async def list_tools(self, server: MCPServer) -> List[MCPTool]:
         """
@@ -109,24 +549,58 @@ class MCPService:
         Returns:
             List[MCPTool]: 工具列表
         """
-        server_key = self._get_server_key(server)
-
-        # 检查缓存
-        if self._is_cache_valid(server_key) and server_key in self._tool_cache:
-            logger.debug(f"[MCP] 使用缓存的工具列表: {server.name}")
-            return self._tool_cache[server_key]
-
-        # 获取工具列表
-        tools = await self._list_tools_impl(server)
+        cache_key = self._get_tool_cache_key(server)
+
+        # 检查缓存：有缓存时直接返回，过旧则在后台刷新
+        cached = self._tool_cache.get(cache_key)
+        if cached is not None:
+            if self._needs_refresh(cache_key):
+                logger.debug("[MCP] 后台刷新工具列表: %s", server.name)
+                self._start_fetch(server, cache_key)
+            else:
+                logger.debug("[MCP] 使用缓存的工具列表: %s", server.name)
+            return cached
+
+        # 没有缓存时等待获取；shield：单个调用方被取消时不影响其他等待者
+        return await asyncio.shield(self._start_fetch(server, cache_key))
+
+    def _start_fetch(
+        self, server: MCPServer, cache_key: ToolCacheKey
+    ) -> "asyncio.Future[List[MCPTool]]":
+        """启动工具列表获取，同一服务器的并发请求共享一次获取"""
+        self._bind_loop()
+        inflight = self._inflight.get(cache_key)
+        if inflight is None:
+            inflight = asyncio.ensure_future(self._fetch_tools(server, cache_key))
+            self._inflight[cache_key] = inflight
+            inflight.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
+        return inflight
+
+    async def _fetch_tools(
+        self, server: MCPServer, cache_key: ToolCacheKey
+    ) -> List[MCPTool]:
+        """获取并过滤工具列表，然后更新缓存"""
+        # 获取工具列表；后台刷新已有的缓存时跳过磁盘缓存，确保重新请求服务器
+        tools = await self._list_tools_impl(
+            server, use_disk_cache=cache_key not in self._tool_cache
+        )
+        if tools is None:
+            # 获取失败时保留已缓存的列表（没有缓存时缓存空列表），只推迟下次刷新
+            tools = self._tool_cache.setdefault(cache_key, [])
+            self._refresh_deadline[cache_key] = (
+                time.monotonic() + self._refresh_threshold
+            )
+            return tools
 
         # 过滤被禁用的工具
-        if server.disabled_tools:
-            tools = [tool for tool in tools if tool.name not in server.disabled_tools]
-            logger.info(f"[MCP] 过滤后剩余 {len(tools)} 个工具: {server.name}")
+        disabled_tools = cache_key[1]
+        if disabled_tools:
+            tools = [tool for tool in tools if tool.name not in disabled_tools]
+            logger.info("[MCP] 过滤后剩余 %s 个工具: %s", len(tools), server.name)
 
         # 更新缓存
-        self._tool_cache[server_key] = tools
-        self._cache_ttl[server_key] = time.time()
+        self._tool_cache[cache_key] = tools
+        self._refresh_deadline[cache_key] = time.monotonic() + self._refresh_threshold
 
         return tools
 
@@ -142,15 +616,20 @@ class MCPService:
         """
         all_tools: List[MCPTool] = []
 
-        for server in servers:
-            try:
-                tools = await self.list_tools(server)
-                all_tools.extend(tools)
-            except Exception as error:
-                logger.error(f"[MCP] 获取服务器工具失败: {server.name}", exc_info=error)
+        # 并发获取各服务器的工具列表
+        results = await asyncio.gather(
+            *(self.list_tools(server) for server in servers), return_exceptions=True
+        )
+
+        for server, tools in zip(servers, results):
+            if isinstance(tools, BaseException):
+                logger.error(
+                    "[MCP] 获取服务器工具失败: %s", server.name, exc_info=tools
+                )
                 continue
+            all_tools.extend(tools)
 
-        logger.info(f"[MCP] 总共获取到 {len(all_tools)} 个工具")
+        logger.info("[MCP] 总共获取到 %s 个工具", len(all_tools))
         return all_tools
 
     async def call_tool(
@@ -168,26 +647,45 @@ class MCPService:
             Dict[str, Any]: 工具调用结果
         """
         try:
-            logger.info(f"[MCP] 调用工具: {tool_name} 在服务器: {server.name}")
+            logger.info("[MCP] 调用工具: %s 在服务器: %s", tool_name, server.name)
 
-            # 创建服务器参数
-            server_params = StdioServerParameters(
-                command=server.command, args=server.args, env=server.env
+            # 复用服务器会话调用工具
+            result = await self._with_session(
+                server, lambda session: session.call_tool(tool_name, arguments)
             )
 
-            # 使用正确的连接方式调用工具
-            async with stdio_client(server_params) as (read, write):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    result = await session.call_tool(tool_name, arguments)
-
-                    logger.info(f"[MCP] 工具调用成功: {tool_name}")
-                    return result
+            logger.info("[MCP] 工具调用成功: %s", tool_name)
+            return result
 
         except Exception as error:
-            logger.error(f"[MCP] 工具调用失败: {tool_name}", exc_info=error)
+            logger.error("[MCP] 工具调用失败: %s", tool_name, exc_info=error)
             raise
 
+    async def call_tool_batched(
+        self, server: MCPServer, calls: List[Tuple[str, Dict[str, Any]]]
+    ) -> List[Any]:
+        """
+        批量调用同一服务器上的多个MCP工具
+
+        各调用并发执行，分摊到会话池中的多个会话上，总耗时约为单次往返
+
+        Args:
+            server: MCP服务器配置
+            calls: (工具名称, 工具参数) 列表
+
+        Returns:
+            List[Any]: 与calls顺序一致的结果列表，失败的调用对应其异常对象
+        """
+        return list(
+            await asyncio.gather(
+                *(
+                    self.call_tool(server, tool_name, arguments)
+                    for tool_name, arguments in calls
+                ),
+                return_exceptions=True,
+            )
+        )
+
 
 # 全局服务实例
 _mcp_service_instance: Optional[MCPService] = None
@@ -230,3 +728,13 @@ async def list_mcp_tools(servers: List[MCPServer]) -> List[MCPTool]:
     """
     service = get_mcp_service()
     return await service.get_all_tools(servers)
+
+
+async def close_mcp_service() -> None:
+    """
+    关闭全局MCP服务实例持有的所有服务器会话
+
+    应在事件循环结束前调用，确保stdio子进程被正常回收
+    """
+    if _mcp_service_instance is not None:
+        await _mcp_service_instance.aclose()
@@ -3,16 +3,37 @@
 """
 
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, FrozenSet, List, Optional, Any
 from pydantic import BaseModel, Field
 from dataclasses import dataclass
-from dotenv import load_dotenv
 
-# 加载环境变量
-load_dotenv()
+# 环境变量是否已加载（推迟到首次读取默认配置时）
+_dotenv_loaded = False
 
 
-@dataclass
+def load_dotenv_once() -> None:
+    """首次使用时加载环境变量"""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _dotenv_loaded = True
+
+
+def _default_model() -> str:
+    """默认模型名称"""
+    load_dotenv_once()
+    return os.getenv("MODEL_NAME", os.getenv("DEFAULT_MODEL", "gpt-3.5-turbo"))
+
+
+def _default_temperature() -> float:
+    """默认温度参数"""
+    load_dotenv_once()
+    return float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
+
+
+@dataclass(slots=True)
 class MCPServer:
     """MCP服务器配置"""
 
@@ -23,6 +44,11 @@ class MCPServer:
     env: Optional[Dict[str, str]] = None
     disabled_tools: Optional[List[str]] = None
 
+    @property
+    def disabled_tools_set(self) -> FrozenSet[str]:
+        """被禁用工具名称的集合，用于O(1)成员判断；每次按当前的disabled_tools生成"""
+        return frozenset(self.disabled_tools or ())
+
 
 class MCPTool(BaseModel):
     """MCP工具定义"""
@@ -67,16 +93,10 @@ class ChatRequest(BaseModel):
     """聊天请求"""
 
     messages: List[ChatMessage]
-    model: str = Field(
-        default_factory=lambda: os.getenv(
-            "MODEL_NAME", os.getenv("DEFAULT_MODEL", "gpt-3.5-turbo")
-        )
-    )
+    model: str = Field(default_factory=_default_model)
     enabled_mcps: Optional[List[MCPServer]] = None
     stream: bool = False
-    temperature: float = Field(
-        default_factory=lambda: float(os.getenv("DEFAULT_TEMPERATURE", "0.7"))
-    )
+    temperature: float = Field(default_factory=_default_temperature)
 
 
 class ChatResponse(BaseModel):
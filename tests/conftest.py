@@ -3,8 +3,13 @@ pytest配置文件
 确保测试时能正确导入src目录下的模块
 """
 
+import asyncio
 import sys
 from pathlib import Path
+from typing import Callable, Dict
+
+import pytest
+import pytest_asyncio
 
 # 获取项目根目录
 project_root = Path(__file__).parent.parent
@@ -17,3 +22,23 @@ if str(src_path) not in sys.path:
 # 确保项目根目录也在路径中
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
+
+
+def pytest_asyncio_loop_factories(
+    config: pytest.Config, item: pytest.Item
+) -> Dict[str, Callable[[], asyncio.AbstractEventLoop]]:
+    """安装了uvloop时使用uvloop事件循环，加快MCP服务器stdio管道的读写"""
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest_asyncio.fixture(scope="session", autouse=True, loop_scope="session")
+async def _close_mcp_service():
+    """测试会话结束时在同一事件循环内关闭MCP服务，回收池化的服务器进程"""
+    yield
+    from chat_mcp.mcp_service import close_mcp_service
+
+    await close_mcp_service()
@@ -0,0 +1,26 @@
+"""
+测试用的本地MCP服务器：通过stdio运行，不依赖网络
+"""
+
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("chat-mcp-test")
+
+
+@mcp.tool()
+def echo(text: str) -> str:
+    """原样返回输入的文本"""
+    return text
+
+
+@mcp.tool()
+async def delayed_echo(text: str, delay: float) -> str:
+    """等待delay秒后返回输入的文本"""
+    await asyncio.sleep(delay)
+    return text
+
+
+if __name__ == "__main__":
+    mcp.run()
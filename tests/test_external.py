@@ -70,12 +70,11 @@ def test_package_info():
             print("⚠️  未找到版本信息")
 
         # 检查可用的API
-        available_apis = [attr for attr in dir(chat_mcp) if not attr.startswith("_")]
+        # 包的__dir__只合并__all__，不会触发子模块的懒加载
+        available_apis = {attr for attr in dir(chat_mcp) if not attr.startswith("_")}
         print(f"✅ 可用的公共API: {len(available_apis)} 个")
         print("   主要API:")
-        for api in ["MCPChatTool", "create_server_config", "MCPService", "AIProvider"][
-            :4
-        ]:
+        for api in ("MCPChatTool", "create_server_config", "MCPService", "AIProvider"):
             if api in available_apis:
                 print(f"   ✓ {api}")
             else:
@@ -42,14 +42,17 @@ async def test_mcp_chat_tool():
         # 进行对话，会自动工具调用
         print("\n💬 开始对话...")
 
-        def progress_callback(message):
-            print(f"📈 {message}")
-
-        result = await chat_tool.chat_with_mcp(
+        result = {}
+        async for event in chat_tool.chat_with_mcp_stream(
             user_message="搜索最新的关于 transformer neural networks 的论文，帮我找到3篇相关的论文",
             system_prompt="你是一个学术研究助手，善于帮助用户找到相关的学术论文。",
-            on_progress=progress_callback,
-        )
+        ):
+            if event["type"] == "token":
+                print(event["data"], end="", flush=True)
+            elif event["type"] == "progress":
+                print(f"📈 {event['data']}")
+            else:
+                result = event["data"]
 
         print(f"\n🎯 最终回答: {result['content']}")
         print(f"🔧 工具调用次数: {len(result.get('tool_calls', []))}")
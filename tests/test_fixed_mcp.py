@@ -8,12 +8,9 @@ import logging
 import sys
 from pathlib import Path
 
-# 添加src路径到Python路径中
-sys.path.insert(0, str(Path(__file__).parent / "src"))
-
 # 导入我们的模块
-from src.chat_mcp import MCPServer
-from src.chat_mcp.mcp_service import MCPService
+from chat_mcp import MCPServer
+from chat_mcp.mcp_service import MCPService
 
 # 设置日志
 logging.basicConfig(
@@ -48,7 +45,7 @@ async def test_arxiv_mcp_fixed():
     )
 
     logger.info("=== 开始测试修复后的ArXiv MCP服务器 ===")
-    logger.info(f"服务器配置: {arxiv_server}")
+    logger.info("服务器配置: %s", arxiv_server)
     logger.info(f"存储路径: {storage_path.absolute()}")
 
     service = MCPService()
@@ -61,10 +58,9 @@ async def test_arxiv_mcp_fixed():
         if tools:
             logger.info(f"✅ 成功获取到 {len(tools)} 个工具:")
             for tool in tools:
-                logger.info(f"  - {tool.name}: {tool.description}")
-                logger.info(f"    服务器: {tool.server_name} (ID: {tool.server_id})")
-                logger.info(f"    工具ID: {tool.id}")
-                logger.info(f"    输入架构: {tool.inputSchema}")
+                logger.info("  - %s: %s", tool.name, tool.description)
+                logger.info("    服务器: %s (ID: %s)", tool.server_name, tool.server_id)
+                logger.info("    工具ID: %s", tool.id)
                 logger.info("")
         else:
             logger.warning("❌ 未获取到任何工具")
@@ -90,7 +86,7 @@ async def test_arxiv_mcp_fixed():
                     "search_papers",
                     {"query": "attention mechanism", "max_results": 2},
                 )
-                logger.info(f"✅ 工具调用成功: {result}")
+                logger.info("✅ 工具调用成功: %s", result)
             except Exception as e:
                 logger.error(f"❌ 工具调用失败: {e}")
 
@@ -0,0 +1,68 @@
+"""
+IPC结果序列化测试：pydantic模型、dataclass及其嵌套结构
+"""
+
+import json
+
+import pytest
+
+import chat_mcp.ipc_handler as ipc_handler
+from chat_mcp import MCPCallToolResponse, MCPServer, serialize_ipc_result
+
+
+def make_server() -> MCPServer:
+    """构建带禁用工具配置的服务器"""
+    return MCPServer(
+        id="server1",
+        name="Server 1",
+        command="python",
+        args=["-m", "server"],
+        env={"KEY": "value"},
+        disabled_tools=["delete_file"],
+    )
+
+
+EXPECTED_SERVER = {
+    "id": "server1",
+    "name": "Server 1",
+    "command": "python",
+    "args": ["-m", "server"],
+    "env": {"KEY": "value"},
+    "disabled_tools": ["delete_file"],
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def serializer(request, monkeypatch):
+    """分别使用orjson和标准库json序列化"""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(ipc_handler, "_orjson", None)
+    return serialize_ipc_result
+
+
+def test_serialize_pydantic_model(serializer):
+    """测试pydantic模型序列化为其字段"""
+    response = MCPCallToolResponse(
+        content=[{"type": "text", "text": "结果"}], isError=False
+    )
+
+    assert json.loads(serializer(response)) == response.model_dump(mode="json")
+
+
+def test_serialize_server(serializer):
+    """测试MCPServer及嵌套在列表、字典中的MCPServer"""
+    server = make_server()
+
+    assert json.loads(serializer(server)) == EXPECTED_SERVER
+    assert json.loads(serializer([server])) == [EXPECTED_SERVER]
+    assert json.loads(serializer({"servers": [server]})) == {
+        "servers": [EXPECTED_SERVER]
+    }
+
+
+def test_serialize_unsupported_type(serializer):
+    """测试无法序列化的类型抛出TypeError"""
+    with pytest.raises(TypeError):
+        serializer({"value": object()})
@@ -0,0 +1,218 @@
+"""
+MCPService行为测试：使用本地的stdio MCP服务器（tests/mcp_test_server.py）
+"""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import anyio
+import pytest
+import pytest_asyncio
+
+from chat_mcp import MCPServer
+from chat_mcp import mcp_service
+from chat_mcp.mcp_service import MCPService
+
+# 本地测试服务器脚本
+TEST_SERVER_SCRIPT = Path(__file__).with_name("mcp_test_server.py")
+
+
+@pytest.fixture
+def local_server() -> MCPServer:
+    """使用当前解释器启动的本地MCP服务器配置"""
+    return MCPServer(
+        id="local_test_server",
+        name="Local Test Server",
+        command=sys.executable,
+        args=[str(TEST_SERVER_SCRIPT)],
+    )
+
+
+@pytest_asyncio.fixture
+async def service():
+    """独立的MCPService实例，测试结束时关闭其会话"""
+    service = MCPService()
+    yield service
+    await service.aclose()
+
+
+async def test_concurrent_misses_share_one_fetch(service, local_server):
+    """测试并发的缓存未命中只获取一次工具列表"""
+    fetch_count = 0
+    list_tools_impl = service._list_tools_impl
+
+    async def counting_list_tools_impl(server, **kwargs):
+        nonlocal fetch_count
+        fetch_count += 1
+        return await list_tools_impl(server, **kwargs)
+
+    service._list_tools_impl = counting_list_tools_impl
+
+    results = await asyncio.gather(
+        *(service.list_tools(local_server) for _ in range(8))
+    )
+
+    assert fetch_count == 1, "并发请求应共享同一次获取"
+    assert all(tools is results[0] for tools in results), "所有调用方应得到同一列表"
+    assert {tool.name for tool in results[0]} == {"echo", "delayed_echo"}
+
+
+def test_service_survives_consecutive_event_loops(local_server):
+    """测试同一服务实例可在先后两次asyncio.run中使用"""
+    service = MCPService()
+
+    async def call_echo(text: str) -> str:
+        result = await service.call_tool(local_server, "echo", {"text": text})
+        return result.content[0].text
+
+    assert asyncio.run(call_echo("first")) == "first"
+    assert asyncio.run(call_echo("second")) == "second"
+    asyncio.run(service.aclose())
+
+
+async def test_refresh_failure_keeps_cached_tools(service, local_server, monkeypatch):
+    """测试后台刷新失败时保留已缓存的工具列表"""
+    monkeypatch.delenv("CHAT_MCP_TOOL_CACHE", raising=False)
+    tools = await service.list_tools(local_server)
+    cache_key = service._get_tool_cache_key(local_server)
+
+    # 缓存过期，且服务器请求失败
+    service._refresh_deadline[cache_key] = 0.0
+    service._with_session = AsyncMock(side_effect=OSError("服务器不可用"))
+
+    assert await service.list_tools(local_server) is tools, "过期时应先返回旧列表"
+    await service._inflight[cache_key]
+
+    assert service._tool_cache[cache_key] is tools, "刷新失败不应覆盖已缓存的列表"
+    assert not service._needs_refresh(cache_key), "刷新失败后应推迟下次刷新"
+    assert await service.list_tools(local_server) is tools
+
+
+async def test_disk_cache_skips_server(local_server, monkeypatch, tmp_path):
+    """测试启用磁盘缓存后，新的服务实例无需连接服务器即可得到工具列表"""
+    monkeypatch.setenv("CHAT_MCP_TOOL_CACHE", "1")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    first = MCPService()
+    try:
+        tools = await first.list_tools(local_server)
+    finally:
+        await first.aclose()
+    assert list((tmp_path / "chat_mcp" / "tools").glob("*.json")), "应写入磁盘缓存"
+
+    second = MCPService()
+    second._with_session = AsyncMock(side_effect=AssertionError("不应连接服务器"))
+    cached_tools = await second.list_tools(local_server)
+
+    assert [tool.name for tool in cached_tools] == [tool.name for tool in tools]
+    assert [tool.inputSchema for tool in cached_tools] == [
+        tool.inputSchema for tool in tools
+    ]
+    second._with_session.assert_not_called()
+
+
+async def test_disk_cache_expires_and_refresh_bypasses_it(
+    local_server, monkeypatch, tmp_path
+):
+    """测试磁盘缓存过期后重新请求服务器，且后台刷新不读取磁盘缓存"""
+    monkeypatch.setenv("CHAT_MCP_TOOL_CACHE", "1")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    cache_path = mcp_service._disk_cache_path(local_server)
+    stale_specs = [{"name": "stale", "description": "", "inputSchema": {}}]
+
+    service = MCPService()
+    try:
+        # 过期的磁盘缓存不应被使用
+        mcp_service._write_disk_cache(cache_path, stale_specs)
+        expired = time.time() - mcp_service._DISK_CACHE_MAX_AGE - 60
+        os.utime(cache_path, (expired, expired))
+        tools = await service.list_tools(local_server)
+        assert {tool.name for tool in tools} == {"echo", "delayed_echo"}
+
+        # 磁盘缓存未过期，但后台刷新仍应请求服务器
+        mcp_service._write_disk_cache(cache_path, stale_specs)
+        cache_key = service._get_tool_cache_key(local_server)
+        service._refresh_deadline[cache_key] = 0.0
+        assert await service.list_tools(local_server) is tools
+        await service._inflight[cache_key]
+
+        refreshed = service._tool_cache[cache_key]
+        assert {tool.name for tool in refreshed} == {"echo", "delayed_echo"}
+        assert mcp_service._read_disk_cache(cache_path) != stale_specs, "应更新磁盘缓存"
+    finally:
+        await service.aclose()
+
+
+def test_disk_cache_key_includes_env(local_server, monkeypatch):
+    """测试环境变量不同的服务器使用不同的磁盘缓存"""
+    monkeypatch.setenv("CHAT_MCP_TOOL_CACHE", "1")
+    other_server = MCPServer(
+        id=local_server.id,
+        name=local_server.name,
+        command=local_server.command,
+        args=local_server.args,
+        env={"API_KEY": "other"},
+    )
+
+    assert mcp_service._disk_cache_path(local_server) != mcp_service._disk_cache_path(
+        other_server
+    )
+
+
+async def test_call_tool_batched_preserves_order(service, local_server):
+    """测试批量调用的结果顺序与调用顺序一致，即使后发的调用先完成"""
+    calls = [
+        ("delayed_echo", {"text": str(index), "delay": 0.05 * (3 - index)})
+        for index in range(4)
+    ]
+    calls.insert(2, ("missing_tool", {}))
+
+    results = await service.call_tool_batched(local_server, calls)
+
+    assert len(results) == len(calls)
+    texts = [
+        result.content[0].text for index, result in enumerate(results) if index != 2
+    ]
+    assert texts == ["0", "1", "2", "3"], "结果应按调用顺序排列"
+    assert results[2].isError, "不存在的工具应在对应位置返回错误结果"
+
+
+async def test_failed_request_is_not_retried(service, local_server):
+    """测试请求发出后失败不重试，且业务错误不丢弃会话"""
+    attempts = 0
+
+    async def failing_operation(session):
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("工具执行失败")
+
+    with pytest.raises(RuntimeError):
+        await service._with_session(local_server, failing_operation)
+
+    server_key = service._get_server_key(local_server)
+    assert attempts == 1, "非幂等请求不应重试"
+    assert len(service._session_pool._idle[server_key]) == 1, "会话应归还到池中"
+
+
+async def test_idempotent_request_retries_closed_connection(service, local_server):
+    """测试幂等请求遇到连接断开时换新会话重试一次"""
+    sessions = []
+
+    async def operation(session):
+        sessions.append(session)
+        if len(sessions) == 1:
+            raise anyio.ClosedResourceError
+        return await session.list_tools()
+
+    result = await service._with_session(local_server, operation, idempotent=True)
+
+    server_key = service._get_server_key(local_server)
+    assert {tool.name for tool in result.tools} == {"echo", "delayed_echo"}
+    assert len(sessions) == 2 and sessions[0] is not sessions[1], "应使用新会话重试"
+    assert service._session_pool._idle[server_key] == [
+        sessions[1]
+    ], "断开的会话应被丢弃"
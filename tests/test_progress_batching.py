@@ -0,0 +1,48 @@
+"""
+BatchingProgressSink测试：按数量上限或时间间隔批量回调进度事件
+"""
+
+import asyncio
+
+from chat_mcp.easy_chat import BatchingProgressSink
+
+
+async def test_flushes_after_interval():
+    """测试未达到数量上限时，间隔到期后批量回调"""
+    batches = []
+    sink = BatchingProgressSink(batches.append, max_batch=16, flush_interval=0.02)
+
+    sink("a")
+    sink("b")
+    assert batches == [], "间隔到期前不应回调"
+
+    await asyncio.sleep(0.1)
+    assert batches == [["a", "b"]], "间隔到期后应一次回调所有事件"
+
+    sink("c")
+    await asyncio.sleep(0.1)
+    assert batches == [["a", "b"], ["c"]], "新事件应重新开始计时"
+
+
+async def test_flushes_at_max_batch():
+    """测试达到数量上限时立即回调，并取消待执行的定时回调"""
+    batches = []
+    sink = BatchingProgressSink(batches.append, max_batch=3, flush_interval=0.02)
+
+    for event in range(3):
+        sink(event)
+    assert batches == [[0, 1, 2]], "达到上限时应立即回调"
+
+    await asyncio.sleep(0.1)
+    assert batches == [[0, 1, 2]], "已回调的事件不应再次回调"
+
+
+async def test_flush_emits_pending_events():
+    """测试手动flush立即回调缓冲的事件"""
+    batches = []
+    sink = BatchingProgressSink(batches.append, flush_interval=10)
+
+    sink("a")
+    sink.flush()
+    sink.flush()
+    assert batches == [["a"]], "flush应回调一次且不产生空批次"
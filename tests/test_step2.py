@@ -4,6 +4,7 @@ Step2测试：验证MCP工具收集功能
 """
 
 import asyncio
+import dataclasses
 import logging
 from chat_mcp import (
     ChatMCPClient,
@@ -19,6 +20,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ArXiv服务器配置模板，各测试场景通过dataclasses.replace覆盖差异字段
+_ARXIV_SERVER = MCPServer(
+    id="arxiv-server",
+    name="ArXiv研究服务器",
+    command="uvx",
+    args=["mcp-server-arxiv"],
+)
+
+
+def arxiv_server(**changes) -> MCPServer:
+    """基于模板生成ArXiv服务器配置"""
+    return dataclasses.replace(_ARXIV_SERVER, **changes)
+
 
 async def test_tool_collector():
     """测试MCPToolCollector的工具收集功能"""
@@ -38,14 +52,7 @@ async def test_tool_collector():
 
     # 测试场景2：单个服务器
     print("\n2. 测试单个ArXiv MCP服务器")
-    arxiv_server = MCPServer(
-        id="arxiv-server",
-        name="ArXiv研究服务器",
-        command="uvx",
-        args=["mcp-server-arxiv"],
-    )
-
-    tools = await collector.collect_mcp_tools([arxiv_server])
+    tools = await collector.collect_mcp_tools([_ARXIV_SERVER])
     print(f"ArXiv服务器收集到的工具数量: {len(tools)}")
 
     if len(tools) > 0:
@@ -56,11 +63,9 @@ async def test_tool_collector():
 
     # 测试场景3：带禁用工具的服务器
     print("\n3. 测试工具过滤功能")
-    arxiv_server_filtered = MCPServer(
+    arxiv_server_filtered = arxiv_server(
         id="arxiv-server-filtered",
         name="ArXiv研究服务器(过滤版)",
-        command="uvx",
-        args=["mcp-server-arxiv"],
         disabled_tools=["download_paper"],  # 禁用下载功能
     )
 
@@ -73,21 +78,17 @@ async def test_tool_collector():
             print(f"  - {tool.name}")
 
         # 验证禁用的工具确实被过滤了
-        disabled_found = any(tool.name == "download_paper" for tool in filtered_tools)
-        assert not disabled_found, "禁用的工具不应该出现在结果中"
+        filtered_names = {tool.name for tool in filtered_tools}
+        assert "download_paper" not in filtered_names, "禁用的工具不应该出现在结果中"
         print("✅ 工具过滤功能正常")
 
     # 测试场景4：多个服务器
     print("\n4. 测试多服务器工具收集")
     servers = [
-        MCPServer(
-            id="arxiv-1", name="ArXiv服务器1", command="uvx", args=["mcp-server-arxiv"]
-        ),
-        MCPServer(
+        arxiv_server(id="arxiv-1", name="ArXiv服务器1"),
+        arxiv_server(
             id="arxiv-2",
             name="ArXiv服务器2",
-            command="uvx",
-            args=["mcp-server-arxiv"],
             disabled_tools=["search_papers"],  # 禁用搜索功能
         ),
     ]
@@ -96,7 +97,7 @@ async def test_tool_collector():
     print(f"多服务器收集到的工具数量: {len(multi_tools)}")
 
     # 验证工具来源
-    server_ids = set(tool.server_id for tool in multi_tools)
+    server_ids = {tool.server_id for tool in multi_tools}
     print(f"工具来源服务器: {server_ids}")
 
     return tools, filtered_tools, multi_tools
@@ -113,14 +114,7 @@ async def test_chat_client():
     request = ChatRequest(
         messages=[ChatMessage(role="user", content="帮我搜索关于机器学习的论文")],
         model="gpt-3.5-turbo",
-        enabled_mcps=[
-            MCPServer(
-                id="arxiv-server",
-                name="ArXiv研究助手",
-                command="uvx",
-                args=["mcp-server-arxiv"],
-            )
-        ],
+        enabled_mcps=[arxiv_server(name="ArXiv研究助手")],
     )
 
     response = await client.chat(request)
@@ -150,11 +144,9 @@ async def test_chat_client():
         messages=[ChatMessage(role="user", content="帮我搜索论文，但不要下载")],
         model="gpt-4",
         enabled_mcps=[
-            MCPServer(
+            arxiv_server(
                 id="arxiv-filtered",
                 name="ArXiv研究助手(受限)",
-                command="uvx",
-                args=["mcp-server-arxiv"],
                 disabled_tools=["download_paper", "read_paper"],
             )
         ],
@@ -168,12 +160,7 @@ async def test_chat_client():
     multi_request = ChatRequest(
         messages=[ChatMessage(role="user", content="我需要研究和文件操作功能")],
         enabled_mcps=[
-            MCPServer(
-                id="arxiv-server",
-                name="ArXiv研究",
-                command="uvx",
-                args=["mcp-server-arxiv"],
-            ),
+            arxiv_server(name="ArXiv研究"),
             # 注意：这里添加另一个服务器示例，实际测试时可能不可用
             MCPServer(
                 id="file-server",
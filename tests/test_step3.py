@@ -4,8 +4,16 @@ Step3测试：验证AI Provider集成和MCP工具传递功能
 """
 
 import asyncio
+import contextlib
+import functools
+import io
 import logging
-from typing import List
+import os
+import sys
+import traceback
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+from unittest.mock import AsyncMock
 
 # 导入我们的模块
 from chat_mcp import (
@@ -19,10 +27,6 @@ from chat_mcp import (
     parse_tool_use,
 )
 
-# 设置日志
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -76,16 +80,39 @@ class MockMCPService:
                 server_name="Weather MCP Server",
             ),
         ]
+        # 服务器名称关键字 -> 对应的工具列表
+        self._by_keyword = {
+            "arxiv": [self.mock_tools[0]],
+            "weather": [self.mock_tools[1]],
+        }
 
     async def list_tools(self, server: MCPServer) -> List[MCPTool]:
         """模拟列出工具"""
-        logger.info(f"[Mock] Listing tools for server: {server.name}")
-        if "arxiv" in server.name.lower():
-            return [self.mock_tools[0]]
-        elif "weather" in server.name.lower():
-            return [self.mock_tools[1]]
-        else:
-            return self.mock_tools
+        logger.info("[Mock] Listing tools for server: %s", server.name)
+        name = server.name.lower()
+        for keyword, tools in self._by_keyword.items():
+            if keyword in name:
+                return tools
+        return self.mock_tools
+
+
+@functools.cache
+def _mock_tool_response_chunks(tool_count: int, tool_name: str) -> Tuple[str, ...]:
+    """生成模拟的工具调用响应，按行切分为流式片段（相同参数只生成一次）"""
+    response = f"""我看到有 {tool_count} 个可用工具。让我使用其中一个工具来帮助您：
+
+<tool_use>
+<tool_name>{tool_name}</tool_name>
+<parameters>
+{{
+  "query": "machine learning",
+  "max_results": 3
+}}
+</parameters>
+</tool_use>
+
+我已经调用了 {tool_name} 工具来搜索相关信息。"""
+    return tuple(response.splitlines(keepends=True))
 
 
 class MockAIProvider:
@@ -105,7 +132,9 @@ class MockAIProvider:
     ) -> ChatResponse:
         """模拟AI完成调用"""
         logger.info(
-            f"[MockAI] Received {len(messages)} messages with {len(mcp_tools) if mcp_tools else 0} tools"
+            "[MockAI] Received %s messages with %s tools",
+            len(messages),
+            len(mcp_tools) if mcp_tools else 0,
         )
 
         # 检查系统消息是否包含工具信息
@@ -118,21 +147,15 @@ class MockAIProvider:
         # 模拟工具调用响应
         if mcp_tools and len(mcp_tools) > 0:
             # 如果有工具，模拟一个工具调用
-            mock_response = f"""我看到有 {len(mcp_tools)} 个可用工具。让我使用其中一个工具来帮助您：
-
-<tool_use>
-<tool_name>{mcp_tools[0].name}</tool_name>
-<parameters>
-{{
-  "query": "machine learning",
-  "max_results": 3
-}}
-</parameters>
-</tool_use>
-
-我已经调用了 {mcp_tools[0].name} 工具来搜索相关信息。"""
+            chunks = _mock_tool_response_chunks(len(mcp_tools), mcp_tools[0].name)
         else:
-            mock_response = "我是一个有用的助手，目前没有可用的工具。"
+            chunks = ("我是一个有用的助手，目前没有可用的工具。",)
+
+        # 模拟流式输出，与AIProvider一致以{"text": 片段}回调
+        if stream and on_chunk:
+            for chunk in chunks:
+                on_chunk({"text": chunk})
+        mock_response = "".join(chunks)
 
         # 解析工具调用
         tool_calls = parse_tool_use(mock_response)
@@ -347,23 +370,18 @@ async def test_chat_client_full_flow():
     # 执行聊天
     try:
         response = await client.chat(request)
+        metadata = response.message.metadata
 
         print(f"聊天执行成功: {response.message.role == 'assistant'}")
-        print(f"步骤标识: {response.message.metadata.get('step')}")
-        print(f"启用服务器数量: {response.message.metadata.get('enabled_servers')}")
-        print(
-            f"收集的工具数量: {response.message.metadata.get('collected_tools_count')}"
-        )
-        print(f"阶段: {response.message.metadata.get('stage')}")
+        print(f"步骤标识: {metadata.get('step')}")
+        print(f"启用服务器数量: {metadata.get('enabled_servers')}")
+        print(f"收集的工具数量: {metadata.get('collected_tools_count')}")
+        print(f"阶段: {metadata.get('stage')}")
 
         # 验证元数据
-        assert response.message.metadata.get("step") == 3, "步骤应该是3"
-        assert (
-            response.message.metadata.get("enabled_servers") == 2
-        ), "应该有2个启用的服务器"
-        assert (
-            response.message.metadata.get("collected_tools_count") >= 1
-        ), "应该收集到至少1个工具"
+        assert metadata.get("step") == 3, "步骤应该是3"
+        assert metadata.get("enabled_servers") == 2, "应该有2个启用的服务器"
+        assert metadata.get("collected_tools_count") >= 1, "应该收集到至少1个工具"
 
         print("✅ 完整聊天流程测试通过")
 
@@ -382,8 +400,7 @@ async def test_error_handling():
 
     # 创建一个会失败的AI Provider
     class FailingAIProvider:
-        async def completions(self, **kwargs):
-            raise Exception("模拟AI调用失败")
+        completions = AsyncMock(side_effect=RuntimeError("模拟AI调用失败"))
 
     client.ai_provider = FailingAIProvider()
 
@@ -405,10 +422,51 @@ async def test_error_handling():
 
     assert "失败" in response.message.content, "应该包含失败信息"
     assert response.message.metadata.get("error") is not None, "应该保存错误信息"
+    FailingAIProvider.completions.assert_awaited_once()
 
     print("✅ 错误处理测试通过")
 
 
+# 当前测试任务的输出缓冲区，并发执行时各测试的print互不交错
+_test_output: ContextVar[Optional[io.StringIO]] = ContextVar(
+    "_test_output", default=None
+)
+
+
+class _PerTestStdout:
+    """按当前任务的上下文把输出写入对应测试的缓冲区"""
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        return (_test_output.get() or self._stream).write(text)
+
+    def flush(self) -> None:
+        self._stream.flush()
+
+
+async def _run_captured(test) -> bool:
+    """在独立的输出缓冲区中运行单个测试，返回是否通过"""
+    buffer = io.StringIO()
+    _test_output.set(buffer)
+    try:
+        await test()
+        return True
+    except Exception as e:
+        print(f"❌ 测试失败: {test.__name__}")
+        print(f"错误: {e}")
+        # 默认只输出异常类型和信息，设置CHAT_MCP_VERBOSE_TRACE=1时输出完整堆栈
+        if os.getenv("CHAT_MCP_VERBOSE_TRACE") == "1":
+            traceback.print_exc(file=buffer)
+        else:
+            buffer.write("".join(traceback.format_exception_only(e)))
+        return False
+    finally:
+        _test_output.set(None)
+        print(buffer.getvalue(), end="")
+
+
 async def main():
     """运行所有测试"""
     print("🚀 开始Step3测试 - AI Provider集成和MCP工具传递")
@@ -422,20 +480,12 @@ async def main():
         test_error_handling,
     ]
 
-    passed = 0
-    failed = 0
+    # 各测试相互独立，并发执行；每个测试完成后整体输出其缓冲内容
+    with contextlib.redirect_stdout(_PerTestStdout(sys.stdout)):
+        results = await asyncio.gather(*(_run_captured(test) for test in tests))
 
-    for test in tests:
-        try:
-            await test()
-            passed += 1
-        except Exception as e:
-            failed += 1
-            print(f"❌ 测试失败: {test.__name__}")
-            print(f"错误: {e}")
-            import traceback
-
-            traceback.print_exc()
+    passed = sum(results)
+    failed = len(results) - passed
 
     print("\n" + "=" * 60)
     print(f"📊 测试结果: {passed} 通过, {failed} 失败")
@@ -462,4 +512,9 @@ async def main():
 
 
 if __name__ == "__main__":
+    # 直接运行脚本时输出日志；pytest下由其日志捕获负责
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
     asyncio.run(main())
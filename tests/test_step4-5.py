@@ -3,9 +3,14 @@ Task4-5简化测试：专门验证系统提示词构建功能
 测试 buildSystemPrompt 函数是否正确实现了 Cherry Studio 的行为
 """
 
+import contextlib
+import io
 import logging
 import os
 import sys
+from typing import Any, Dict, List
+
+import pytest
 
 # 添加src目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
@@ -15,9 +20,7 @@ from chat_mcp import (
     MCPTool,
     build_system_prompt,
 )
-
-# 设置日志
-logging.basicConfig(level=logging.INFO)
+from chat_mcp.ai_provider import _system_prompt_cache, build_available_tools_prompt
 
 
 def test_build_system_prompt_core():
@@ -218,6 +221,115 @@ def test_multiple_tools():
     return passed == len(multi_tool_checks)
 
 
+def test_system_prompt_cache():
+    """测试工具提示词缓存：内容相同复用，内容变化重建"""
+    print("\n🔍 测试工具提示词缓存")
+
+    def make_tool(description: str) -> MCPTool:
+        return MCPTool(
+            id="cache1",
+            name="cache_tool",
+            description=description,
+            inputSchema={
+                "type": "object",
+                "properties": {"q": {"type": "string", "description": "Query"}},
+                "required": ["q"],
+            },
+            server_id="cache",
+            server_name="Cache",
+        )
+
+    first = build_system_prompt("You are an assistant.", [make_tool("First")])
+    again = build_system_prompt("You are an assistant.", [make_tool("First")])
+    changed = build_system_prompt("You are an assistant.", [make_tool("Second")])
+
+    assert first == again, "相同工具列表应得到相同的提示词"
+    assert "Second" in changed and "First" not in changed, "工具变化后应重建提示词"
+
+    # 参数结构被原地修改后也应重建提示词
+    tool = make_tool("First")
+    build_system_prompt("You are an assistant.", [tool])
+    tool.inputSchema["properties"]["q"]["description"] = "Keyword"
+    mutated = build_system_prompt("You are an assistant.", [tool])
+    assert "Keyword" in mutated, "参数结构变化后应重建提示词"
+    print("✅ 工具提示词缓存测试通过")
+
+
+def test_system_prompt_keeps_parameter_order():
+    """测试系统提示词按参数结构中的顺序列出参数"""
+
+    def make_tool(properties: Dict[str, Any]) -> MCPTool:
+        return MCPTool(
+            id="order1",
+            name="search_papers",
+            description="Search papers",
+            inputSchema={"type": "object", "properties": properties},
+            server_id="order",
+            server_name="Order",
+        )
+
+    properties = {
+        "query": {"type": "string", "description": "Search query"},
+        "max_results": {"type": "integer", "description": "Result limit"},
+        "abstract": {"type": "boolean", "description": "Include abstracts"},
+    }
+    tool = make_tool(properties)
+    prompt = build_system_prompt("You are an assistant.", [tool])
+
+    positions = [prompt.index(f"- {name} (") for name in properties]
+    assert positions == sorted(positions), "参数应按参数结构中的顺序列出"
+    assert build_available_tools_prompt([tool]) in prompt
+
+    # 内容相同但顺序不同的参数结构不应复用缓存
+    reordered = make_tool(dict(reversed(list(properties.items()))))
+    reordered_prompt = build_system_prompt("You are an assistant.", [reordered])
+    assert reordered_prompt.index("- abstract (") < reordered_prompt.index("- query (")
+    print("✅ 参数顺序测试通过")
+
+
+def _make_benchmark_tools(count: int) -> List[MCPTool]:
+    """生成指定数量的测试工具"""
+    return [
+        MCPTool(
+            id=f"bench{i}",
+            name=f"bench_tool_{i}",
+            description=f"Benchmark tool {i}",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Search query"},
+                    "limit": {"type": "integer", "description": "Result limit"},
+                },
+                "required": ["query"],
+            },
+            server_id="bench",
+            server_name="Bench",
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("tool_count", [1, 2, 20])
+def test_build_system_prompt_benchmark(request, tool_count):
+    """基准测试：不同工具数量下构建系统提示词的耗时（需安装pytest-benchmark）"""
+    # 未安装pytest-benchmark或以-p no:benchmark禁用时跳过
+    if not request.config.pluginmanager.hasplugin("benchmark"):
+        pytest.skip("pytest-benchmark未启用")
+    benchmark = request.getfixturevalue("benchmark")
+
+    tools = _make_benchmark_tools(tool_count)
+    # 每轮开始前清空提示词缓存，测量的是实际渲染而不是缓存命中
+    result = benchmark.pedantic(
+        build_system_prompt,
+        args=("You are an assistant.", tools),
+        setup=_system_prompt_cache.clear,
+        rounds=20,
+    )
+
+    assert all(tool.name in result for tool in tools), "应包含所有工具"
+    assert result.count("(required)") == tool_count, "每个工具都应标记必需参数"
+
+
 def main():
     """主测试函数"""
     print("🚀 Task4-5核心功能测试")
@@ -249,6 +361,9 @@ def main():
 
 
 if __name__ == "__main__":
+    # 直接运行脚本时输出日志；pytest下由其日志捕获负责
+    logging.basicConfig(level=logging.INFO)
+
     # 检查虚拟环境
     if hasattr(sys, "real_prefix") or (
         hasattr(sys, "base_prefix") and sys.base_prefix != sys.prefix
@@ -257,5 +372,11 @@ if __name__ == "__main__":
     else:
         print("⚠️  不在虚拟环境中运行")
 
-    success = main()
+    # 测试输出先写入内存缓冲区，结束时一次性输出，避免逐行刷新终端
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            success = main()
+    finally:
+        sys.stdout.write(output.getvalue())
     sys.exit(0 if success else 1)
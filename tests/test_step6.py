@@ -207,6 +207,36 @@ async def test_upsert_tool_response():
     print("✅ 工具响应更新测试通过")
 
 
+async def test_upsert_tool_response_with_index():
+    """测试带索引的工具响应更新"""
+    print("\n=== 测试3b: 带索引的工具响应更新 ===")
+
+    tool_responses: List[MCPToolResponse] = []
+    response_index = {}
+
+    tool_call = MCPToolCall(id="call_1", name="search_arxiv", arguments={"query": "AI"})
+
+    for response_id in ("response_1", "response_2"):
+        upsert_mcp_tool_response(
+            tool_responses,
+            MCPToolResponse(id=response_id, tool=tool_call, status="invoking"),
+            response_index=response_index,
+        )
+
+    upsert_mcp_tool_response(
+        tool_responses,
+        MCPToolResponse(id="response_2", tool=tool_call, status="done"),
+        response_index=response_index,
+    )
+
+    assert len(tool_responses) == 2
+    assert response_index == {"response_1": 0, "response_2": 1}
+    assert tool_responses[0].status == "invoking"
+    assert tool_responses[1].status == "done"
+
+    print("✅ 带索引的工具响应更新测试通过")
+
+
 async def test_parse_and_call_tools_mock():
     """测试完整的解析和调用流程（模拟版本）"""
     print("\n=== 测试4: 完整解析和调用流程（模拟） ===")
@@ -248,7 +278,12 @@ async def test_parse_and_call_tools_mock():
             role="tool",
             content=text_content,
             tool_call_id=tool_call_id,
-            metadata={"tool_response": response.model_dump()},
+            metadata={
+                "tool_response": {
+                    "content": response.content,
+                    "isError": response.isError,
+                }
+            },
         )
 
     try:
@@ -311,6 +346,23 @@ async def test_edge_cases():
     assert len(unknown_result) == 1  # 应该解析成功，但工具不存在
     print("✅ 未知工具处理正确")
 
+    # 测试大整数与NaN：应与标准库json的解析结果一致
+    numbers_content = """
+    <tool_use>
+    <tool_name>test_tool</tool_name>
+    <parameters>
+    {"id": 123456789012345678901234567890, "threshold": NaN}
+    </parameters>
+    </tool_use>
+    """
+
+    numbers_result = parse_tool_use(numbers_content, [])
+    assert len(numbers_result) == 1
+    arguments = numbers_result[0].tool.arguments
+    assert arguments["id"] == 123456789012345678901234567890
+    assert arguments["threshold"] != arguments["threshold"]  # NaN
+    print("✅ 大整数与NaN处理正确")
+
 
 async def main():
     """运行所有测试"""
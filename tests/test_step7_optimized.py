@@ -189,6 +189,12 @@ async def test_ipc_communication():
         print(f"✅ IPC工具调用: 错误={response.isError}")
         assert isinstance(response, MCPCallToolResponse)
 
+        # 测试批量工具调用
+        responses = await window_api_mcp.callTools([tool_request, tool_request])
+        print(f"✅ IPC批量工具调用: {len(responses)} 个响应")
+        assert len(responses) == 2
+        assert all(isinstance(r, MCPCallToolResponse) for r in responses)
+
     # 测试服务器管理
     restart_result = await window_api_mcp.restartServer(server.id)
     print(f"✅ 重启服务器: {restart_result}")